@@ -11,16 +11,24 @@ Collects stats from:
 
 Serves a real-time dashboard on port 8080.
 
-Install: pip install flask psutil
+Install: pip install -r requirements.txt
 Usage: python collector.py
 """
 from flask import Flask, jsonify, send_from_directory, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from collections import deque
+import bisect
 import threading
 import socket
+import ctypes
+import errno
+import itertools
 import json
+import sched
 import time
 import subprocess
+import re
 import os
 import sys
 
@@ -32,14 +40,92 @@ except ImportError:
     print("Install with: pip install psutil")
     sys.exit(1)
 
+# Optional speedups (C JSON encoder, production WSGI server, response
+# cache, Docker Engine API, in-process ICMP, gzip). Without them we fall
+# back to stdlib json, the Flask dev server, uncached views, the
+# docker/ping CLIs and uncompressed responses.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
+try:
+    from flask_caching import Cache
+except ImportError:
+    Cache = None
+
+try:
+    import docker as docker_sdk
+except ImportError:
+    docker_sdk = None
+
+try:
+    import icmplib
+except ImportError:
+    icmplib = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (much faster on big history lists)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Both parsers take the raw datagram bytes, no .decode() needed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError (a ValueError).
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
 app = Flask(__name__, static_folder='static')
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
+# History and raw log JSON repeats the same keys thousands of times and
+# gzips ~10x; level 4 keeps the CPU cost low
+if Compress is not None:
+    app.config["COMPRESS_MIN_SIZE"] = 1024
+    app.config["COMPRESS_LEVEL"] = 4
+    Compress(app)
+
 # === CONFIGURATION ===
 PI_HOSTNAME = "YlemPi.local"
 UDP_PORT = 8081
 DASHBOARD_PORT = 8080
 ERSATZTV_PORT = 8409
+DISK_PATH = 'C:\\' if os.name == 'nt' else '/'  # Disk space (C: on Windows, / on Linux)
+SERVER_POLL_SECONDS = 5
+DISK_POLL_SECONDS = 60
+NETWORK_POLL_SECONDS = 10
+ALERT_POLL_SECONDS = 5  # Alerts re-run on every publish, and at least this often
+DOCKER_REFRESH_SECONDS = 60  # Full container re-list even if no Docker events arrive
+API_CACHE_SECONDS = 2  # Matches the Pi report cadence; polls inside this window share a result
+
+# Ping latency - Windows: time=XXms or time<1ms
+# Linux: time=XX.X ms
+_PING_RE = re.compile(r'time[=<](\d+\.?\d*)\s*ms', re.IGNORECASE)
+_CHANNEL_RE = re.compile(r'/channel/(\d+)')
+_RISK_ICON = {"ok": "✅", "warning": "⚠️", "danger": "🟠", "critical": "🔴"}
+
+# History settings
+MAX_HISTORY = 43200  # 24 hours at 2-second intervals (24 * 60 * 60 / 2)
+MAX_RAW_LOG = 43200  # 24 hours of raw log entries
+BUCKET_SECONDS = 60  # Raw log is also summarized per minute for /api/history/stats
+MAX_BUCKETS = 24 * 60 + 1  # 24 hours, plus the minute straddling the cutoff
 
 # === GLOBAL STATE ===
 state = {
@@ -47,152 +133,498 @@ state = {
     "docker": {},
     "network": {},
     "pi": {},
-    "pi_history": [],  # Rolling history for graphs
-    "pi_raw_log": [],  # Raw log entries (like terminal output)
+    "pi_history": deque(maxlen=MAX_HISTORY),  # Rolling history for graphs
+    "pi_raw_log": deque(maxlen=MAX_RAW_LOG),  # Raw log entries (like terminal output)
     "alerts": [],
     "last_update": 0,
 }
 
-# History settings
-MAX_HISTORY = 43200  # 24 hours at 2-second intervals (24 * 60 * 60 / 2)
-MAX_RAW_LOG = 43200  # 24 hours of raw log entries
+# Bumped on every publish(); next() on a count is atomic under the GIL
+_version_counter = itertools.count(1)
+_state_version = 0
+
+# Notified after every publish() of a collector section
+state_changed = threading.Condition()
+
+# Per-minute summaries of pi_raw_log, oldest first. Each bucket holds its
+# raw entries while it is live; when the next minute starts the bucket is
+# closed and its aggregate ("agg") is computed once and never changes.
+_buckets = deque(maxlen=MAX_BUCKETS)
+
+# (output key, raw log field) pairs summarized by /api/history/stats
+_HISTORY_METRICS = (
+    ("buffer", "buffer_sec"),
+    ("signal", "signal_dbm"),
+    ("bandwidth", "rx_rate_mbps"),
+    ("drops", "dropped_frames"),
+)
+
+
+def summarize_health():
+    """Build the /api/health summary, plus the Pi's last report time"""
+    pi = state.get("pi", {})
+    summary = {
+        "server_ok": state.get("server", {}).get("cpu_percent", 100) < 90,
+        "docker_npm_ok": state.get("docker", {}).get("npm_healthy", False),
+        "docker_game_ok": state.get("docker", {}).get("game_server_healthy", False),
+        "ersatztv_ok": state.get("server", {}).get("ersatztv_running", False),
+        "pi_connected": False,  # Filled in per request from the Pi's age
+        "pi_latency_ms": state.get("network", {}).get("pi_latency_ms"),
+        "pi_buffering": pi.get("mpv", {}).get("buffering", False),
+        "alert_count": len(state.get("alerts", [])),
+    }
+    return summary, pi.get("received_at", 0)
+
+
+def publish(section, data):
+    """Swap in a fully built section of state.
+
+    Collectors never mutate a published dict in place; they build a new
+    one and rebind it here, so readers always see a complete snapshot.
+    Every publish bumps the state version used as the /api/stats ETag
+    and wakes the alert checker, except for alerts themselves, which are
+    derived from the other sections.
+    """
+    global _state_version, _health
+    state[section] = data
+    state["last_update"] = time.time()
+    _state_version = next(_version_counter)
+    _health = summarize_health()
+    if section != "alerts":
+        with state_changed:
+            state_changed.notify_all()
+
+
+_health = summarize_health()  # (summary, pi_received_at), rebuilt on every publish
 
 
 # ============== DATA COLLECTORS ==============
 
+_ersatztv_proc = None  # Cached psutil.Process for ErsatzTV, re-found only when it exits
+
+
+def find_ersatztv():
+    """Scan the process table for ErsatzTV (only needed when the cached process is gone)"""
+    for proc in psutil.process_iter(['name']):
+        if 'ersatztv' in (proc.info['name'] or '').lower():
+            return proc
+    return None
+
+
+# Arm the non-blocking CPU counter. Only the poller thread samples it after
+# this, so psutil's shared "last CPU times" is never raced.
+psutil.cpu_percent(interval=None)
+
+_disk_usage = None  # Refreshed by sample_disk_usage() every DISK_POLL_SECONDS
+
+
+def sample_disk_usage():
+    """Sample disk space; it changes over minutes, not seconds"""
+    global _disk_usage
+    _disk_usage = psutil.disk_usage(DISK_PATH)
+
+
 def collect_server_stats():
     """Collect Windows/Linux PC stats"""
-    while True:
+    global _ersatztv_proc
+    try:
+        # Non-blocking: percent since the previous call, i.e. one poll interval
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        disk = _disk_usage
+        
+        server = {
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory.percent,
+            "memory_used_gb": round(memory.used / (1024**3), 1),
+            "memory_total_gb": round(memory.total / (1024**3), 1),
+            "timestamp": time.time(),
+        }
+        if disk is not None:
+            server["disk_free_gb"] = round(disk.free / (1024**3), 1)
+            server["disk_total_gb"] = round(disk.total / (1024**3), 1)
+            server["disk_percent"] = disk.percent
+        
+        # ErsatzTV process: reuse the cached handle, rescan only if it exited
+        server["ersatztv_running"] = False
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            
-            # Disk space (C: on Windows, / on Linux)
-            disk_path = 'C:\\' if os.name == 'nt' else '/'
-            disk = psutil.disk_usage(disk_path)
-            
-            state["server"] = {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_used_gb": round(memory.used / (1024**3), 1),
-                "memory_total_gb": round(memory.total / (1024**3), 1),
-                "disk_free_gb": round(disk.free / (1024**3), 1),
-                "disk_total_gb": round(disk.total / (1024**3), 1),
-                "disk_percent": disk.percent,
-                "timestamp": time.time(),
-            }
-            
-            # Find ErsatzTV process
-            for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent', 'pid']):
-                try:
-                    name = proc.info['name'].lower()
-                    if 'ersatztv' in name:
-                        state["server"]["ersatztv_running"] = True
-                        state["server"]["ersatztv_pid"] = proc.info['pid']
-                        state["server"]["ersatztv_cpu"] = proc.info['cpu_percent']
-                        state["server"]["ersatztv_mem"] = proc.info['memory_percent']
-                        break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            else:
-                state["server"]["ersatztv_running"] = False
-                
-        except Exception as e:
-            print(f"[Server] Error: {e}")
+            if _ersatztv_proc is None or not _ersatztv_proc.is_running():
+                _ersatztv_proc = find_ersatztv()
+            if _ersatztv_proc is not None:
+                with _ersatztv_proc.oneshot():
+                    server["ersatztv_cpu"] = _ersatztv_proc.cpu_percent()
+                    server["ersatztv_mem"] = _ersatztv_proc.memory_percent()
+                server["ersatztv_running"] = True
+                server["ersatztv_pid"] = _ersatztv_proc.pid
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            _ersatztv_proc = None
+        
+        publish("server", server)
         
-        time.sleep(5)
+    except Exception as e:
+        print(f"[Server] Error: {e}")
+
+
+def list_containers_cli():
+    """Container list via `docker ps` (fallback when the Docker SDK is unavailable)"""
+    result = subprocess.run(
+        ['docker', 'ps', '-a', '--format', '{{.Names}}\t{{.Status}}\t{{.State}}'],
+        capture_output=True, text=True, timeout=10
+    )
+    
+    containers = {}
+    for line in result.stdout.strip().split('\n'):
+        if line:
+            parts = line.split('\t')
+            if len(parts) >= 3:
+                name = parts[0]
+                containers[name] = {
+                    "status": parts[1],
+                    "state": parts[2],
+                    "healthy": parts[2] == "running"
+                }
+    return containers
+
+
+def list_containers_api(client):
+    """Container list from the Docker Engine API over the SDK's persistent connection"""
+    containers = {}
+    # sparse=True uses the list endpoint only (no per-container inspect)
+    for container in client.containers.list(all=True, sparse=True):
+        attrs = container.attrs
+        name = attrs["Names"][0].lstrip("/")
+        containers[name] = {
+            "status": attrs.get("Status", ""),
+            "state": attrs.get("State", ""),
+            "healthy": attrs.get("State") == "running"
+        }
+    return containers
+
+
+def publish_containers(containers):
+    publish("docker", {
+        "containers": containers,
+        "npm_healthy": containers.get("npm-app-1", {}).get("healthy", False),
+        "game_server_healthy": containers.get("npm-game-server-1", {}).get("healthy", False),
+        "timestamp": time.time(),
+    })
 
 
 def collect_docker_stats():
     """Collect Docker container stats"""
+    client = None
+    if docker_sdk is not None:
+        try:
+            client = docker_sdk.from_env()
+            client.ping()
+        except Exception as e:
+            print(f"[Docker] Engine API unavailable ({e}), polling docker CLI instead")
+            client = None
+    
     while True:
+        if client is not None:
+            try:
+                publish_containers(list_containers_api(client))
+                # Sleep on the event stream: refresh as soon as any container
+                # changes, and at least every DOCKER_REFRESH_SECONDS in case
+                # an event was missed. `until` ends the stream at that time.
+                until = int(time.time() + DOCKER_REFRESH_SECONDS)
+                for _ in client.events(decode=True, filters={"type": "container"}, until=until):
+                    publish_containers(list_containers_api(client))
+            except Exception as e:
+                publish("docker", {"error": str(e), "timestamp": time.time()})
+                time.sleep(10)
+            continue
+        
         try:
-            # Get container list
-            result = subprocess.run(
-                ['docker', 'ps', '-a', '--format', '{{.Names}}\t{{.Status}}\t{{.State}}'],
-                capture_output=True, text=True, timeout=10
-            )
-            
-            containers = {}
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    parts = line.split('\t')
-                    if len(parts) >= 3:
-                        name = parts[0]
-                        containers[name] = {
-                            "status": parts[1],
-                            "state": parts[2],
-                            "healthy": parts[2] == "running"
-                        }
-            
-            state["docker"] = {
-                "containers": containers,
-                "npm_healthy": containers.get("npm-app-1", {}).get("healthy", False),
-                "game_server_healthy": containers.get("npm-game-server-1", {}).get("healthy", False),
-                "timestamp": time.time(),
-            }
-            
+            publish_containers(list_containers_cli())
         except FileNotFoundError:
-            state["docker"] = {"error": "Docker not found", "timestamp": time.time()}
+            publish("docker", {"error": "Docker not found", "timestamp": time.time()})
         except subprocess.TimeoutExpired:
-            state["docker"] = {"error": "Docker timeout", "timestamp": time.time()}
+            publish("docker", {"error": "Docker timeout", "timestamp": time.time()})
         except Exception as e:
-            state["docker"] = {"error": str(e), "timestamp": time.time()}
+            publish("docker", {"error": str(e), "timestamp": time.time()})
         
         time.sleep(10)
 
 
+_use_icmplib = icmplib is not None  # Cleared if unprivileged ICMP turns out to be blocked
+
+
+def ping_icmp():
+    """One echo request over an unprivileged ICMP datagram socket, no subprocess"""
+    host = icmplib.ping(PI_HOSTNAME, count=1, timeout=2, privileged=False)
+    return host.is_alive, (round(host.avg_rtt, 1) if host.is_alive else None)
+
+
+def ping_subprocess():
+    """Ping via the system `ping` binary and parse its output"""
+    # Ping command differs by OS
+    if os.name == 'nt':  # Windows
+        cmd = ['ping', '-n', '1', '-w', '2000', PI_HOSTNAME]
+    else:  # Linux/Mac
+        cmd = ['ping', '-c', '1', '-W', '2', PI_HOSTNAME]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+    
+    latency = None
+    if result.returncode == 0:
+        # Parse ping output for latency
+        match = _PING_RE.search(result.stdout)
+        if match:
+            latency = float(match.group(1))
+    return result.returncode == 0, latency
+
+
 def collect_network_stats():
     """Ping the Pi and check network"""
-    while True:
-        try:
-            # Ping command differs by OS
-            if os.name == 'nt':  # Windows
-                cmd = ['ping', '-n', '1', '-w', '2000', PI_HOSTNAME]
-            else:  # Linux/Mac
-                cmd = ['ping', '-c', '1', '-W', '2', PI_HOSTNAME]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            
-            latency = None
-            if result.returncode == 0:
-                # Parse ping output for latency
-                output = result.stdout
-                # Windows: time=XXms or time<1ms
-                # Linux: time=XX.X ms
-                match = None
-                import re
-                match = re.search(r'time[=<](\d+\.?\d*)\s*ms', output, re.IGNORECASE)
-                if match:
-                    latency = float(match.group(1))
-            
-            state["network"] = {
-                "pi_reachable": result.returncode == 0,
-                "pi_latency_ms": latency,
-                "pi_hostname": PI_HOSTNAME,
-                "timestamp": time.time(),
-            }
-            
-        except subprocess.TimeoutExpired:
-            state["network"] = {
-                "pi_reachable": False,
-                "error": "Ping timeout",
-                "timestamp": time.time(),
-            }
-        except Exception as e:
-            state["network"] = {
-                "pi_reachable": False,
-                "error": str(e),
-                "timestamp": time.time(),
-            }
+    global _use_icmplib
+    try:
+        if _use_icmplib:
+            try:
+                reachable, latency = ping_icmp()
+            except icmplib.SocketPermissionError:
+                # Linux needs net.ipv4.ping_group_range for unprivileged ICMP
+                print("[Network] Unprivileged ICMP not permitted, falling back to ping")
+                _use_icmplib = False
+                reachable, latency = ping_subprocess()
+        else:
+            reachable, latency = ping_subprocess()
         
-        time.sleep(10)
+        publish("network", {
+            "pi_reachable": reachable,
+            "pi_latency_ms": latency,
+            "pi_hostname": PI_HOSTNAME,
+            "timestamp": time.time(),
+        })
+        
+    except subprocess.TimeoutExpired:
+        publish("network", {
+            "pi_reachable": False,
+            "error": "Ping timeout",
+            "timestamp": time.time(),
+        })
+    except Exception as e:
+        publish("network", {
+            "pi_reachable": False,
+            "error": str(e),
+            "timestamp": time.time(),
+        })
+
+
+def aggregate_entries(entries):
+    """Summarize raw log entries into count/sum/min/max per metric"""
+    # Gather each column once, then reduce with the C builtins (one pass
+    # each) rather than calling min()/max() per value in Python
+    entries = list(entries)
+    agg = {
+        "samples": len(entries),
+        "from": float("inf"),
+        "to": float("-inf"),
+        "warnings": 0,
+        "dangers": 0,
+    }
+    if entries:
+        timestamps = [e["timestamp"] for e in entries]
+        agg["from"] = min(timestamps)
+        agg["to"] = max(timestamps)
+        risks = [e.get("risk_level") for e in entries]
+        agg["warnings"] = risks.count("warning")
+        agg["dangers"] = risks.count("danger") + risks.count("critical")
+    
+    for name, field in _HISTORY_METRICS:
+        values = [v for v in (e.get(field) for e in entries) if v is not None]
+        if values:
+            agg[name] = [len(values), sum(values), min(values), max(values)]
+        else:
+            agg[name] = [0, 0, float("inf"), float("-inf")]
+    return agg
+
+
+def merge_aggregates(total, agg):
+    """Fold one aggregate into a running total (in place)"""
+    total["samples"] += agg["samples"]
+    total["from"] = min(total["from"], agg["from"])
+    total["to"] = max(total["to"], agg["to"])
+    total["warnings"] += agg["warnings"]
+    total["dangers"] += agg["dangers"]
+    for name, _ in _HISTORY_METRICS:
+        t, m = total[name], agg[name]
+        t[0] += m[0]
+        t[1] += m[1]
+        t[2] = min(t[2], m[2])
+        t[3] = max(t[3], m[3])
+
+
+def add_to_buckets(entry):
+    """Append a raw log entry to its minute bucket, closing the previous one"""
+    key = int(entry["timestamp"] // BUCKET_SECONDS)
+    # Keys must stay sorted for bisect; if the Pi's clock steps back,
+    # file the entry under the current bucket instead of an older key
+    if _buckets and _buckets[-1]["key"] >= key:
+        _buckets[-1]["entries"].append(entry)
+        return
+    if _buckets:
+        last = _buckets[-1]
+        last["agg"] = aggregate_entries(last["entries"])
+    _buckets.append({"key": key, "entries": [entry], "agg": None})
+
+
+UDP_RECV_BUFSIZE = 8192
+UDP_SOCKET_RCVBUF = 4 * 1024 * 1024  # Kernel queue to ride out GC pauses / big serializations
+UDP_RECV_BATCH = 16  # Datagrams drained per recvmmsg() call
+_MSG_WAITFORONE = 0x10000  # Linux: block for the first datagram, then drain without waiting
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _msghdr), ("msg_len", ctypes.c_uint)]
+
+
+class BatchReceiver:
+    """Receive up to UDP_RECV_BATCH datagrams per syscall with Linux recvmmsg()
+
+    Buffers, iovecs and sockaddr storage are allocated once and reused.
+    """
+    SOCKADDR_IN_SIZE = 16
+    
+    def __init__(self, sock, recvmmsg):
+        self.fd = sock.fileno()
+        self.recvmmsg = recvmmsg
+        self.buffers = [ctypes.create_string_buffer(UDP_RECV_BUFSIZE) for _ in range(UDP_RECV_BATCH)]
+        self.names = [ctypes.create_string_buffer(self.SOCKADDR_IN_SIZE) for _ in range(UDP_RECV_BATCH)]
+        self.iovecs = (_iovec * UDP_RECV_BATCH)()
+        self.msgs = (_mmsghdr * UDP_RECV_BATCH)()
+        for i in range(UDP_RECV_BATCH):
+            self.iovecs[i].iov_base = ctypes.addressof(self.buffers[i])
+            self.iovecs[i].iov_len = UDP_RECV_BUFSIZE
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.names[i])
+            hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            hdr.msg_iovlen = 1
+    
+    def __call__(self):
+        for i in range(UDP_RECV_BATCH):
+            # The kernel overwrites namelen with the actual address length
+            self.msgs[i].msg_hdr.msg_namelen = self.SOCKADDR_IN_SIZE
+        count = self.recvmmsg(self.fd, self.msgs, UDP_RECV_BATCH, _MSG_WAITFORONE, None)
+        if count < 0:
+            err = ctypes.get_errno()
+            if err == errno.EINTR:
+                return []
+            raise OSError(err, os.strerror(err))
+        
+        packets = []
+        for i in range(count):
+            data = ctypes.string_at(self.buffers[i], self.msgs[i].msg_len)
+            name = self.names[i].raw
+            # sockaddr_in: family (2 bytes), port (network order), IPv4 address
+            addr = (socket.inet_ntoa(name[4:8]), int.from_bytes(name[2:4], "big"))
+            packets.append((data, addr))
+        return packets
+
+
+def make_receiver(sock):
+    """Batched recvmmsg() receiver on Linux, plain recvfrom() everywhere else"""
+    if sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL("libc.so.6", use_errno=True)
+            recvmmsg = libc.recvmmsg
+            recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+            recvmmsg.restype = ctypes.c_int
+            return BatchReceiver(sock, recvmmsg)
+        except (OSError, AttributeError):
+            pass
+    return lambda: [sock.recvfrom(UDP_RECV_BUFSIZE)]
+
+
+def handle_pi_packet(data, addr):
+    """Decode one Pi report and fold it into state, history and raw log"""
+    stats = json_loads(data)
+    stats["received_at"] = time.time()
+    stats["source_ip"] = addr[0]
+    
+    # Add to history (for graphs)
+    history_entry = {
+        "timestamp": stats.get("timestamp", time.time()),
+        "signal_dbm": stats.get("wifi", {}).get("signal_dbm"),
+        "link_quality_pct": stats.get("wifi", {}).get("link_quality_pct"),
+        "dropped_frames": stats.get("mpv", {}).get("dropped_frames"),
+        "cache_duration": stats.get("mpv", {}).get("cache_duration_sec"),
+        "cpu_temp": stats.get("system", {}).get("cpu_temp_c"),
+        "rx_rate_mbps": stats.get("rates", {}).get("rx_rate_mbps"),
+        "buffering": stats.get("mpv", {}).get("buffering", False),
+    }
+    # Bounded deque: the oldest entry is evicted automatically
+    state["pi_history"].append(history_entry)
+    
+    # Add raw log entry (like terminal output)
+    wifi = stats.get("wifi", {})
+    mpv = stats.get("mpv", {})
+    system = stats.get("system", {})
+    rates = stats.get("rates", {})
+    
+    # Extract channel from path
+    channel = "N/A"
+    path = mpv.get("path", "")
+    if path:
+        match = _CHANNEL_RE.search(path)
+        if match:
+            channel = match.group(1)
+    
+    risk_level = rates.get("risk_level", "ok")
+    risk_icon = _RISK_ICON.get(risk_level, "?")
+    
+    raw_entry = {
+        "timestamp": stats.get("timestamp", time.time()),
+        "icon": risk_icon,
+        "channel": channel,
+        "signal_dbm": wifi.get("signal_dbm"),
+        "quality_pct": wifi.get("link_quality_pct"),
+        "buffer_sec": mpv.get("cache_duration_sec"),
+        "rx_rate_mbps": rates.get("rx_rate_mbps"),
+        "video_bitrate_kbps": round(mpv.get("video_bitrate_mbps", 0) * 1000) if mpv.get("video_bitrate_mbps") else None,
+        "dropped_frames": mpv.get("dropped_frames"),
+        "cpu_temp": system.get("cpu_temp_c"),
+        "risk_level": risk_level,
+        "risk_reasons": rates.get("risk_reasons", []),
+    }
+    state["pi_raw_log"].append(raw_entry)
+    add_to_buckets(raw_entry)
+    
+    # Publish last so the version bump covers the history appends too
+    publish("pi", stats)
 
 
 def receive_pi_stats():
     """UDP listener for Pi reporter"""
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_SOCKET_RCVBUF)
+    except OSError as e:
+        print(f"⚠️  Could not set UDP receive buffer: {e}")
+    # Linux reports double the usable size and caps requests at net.core.rmem_max
+    granted = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if granted < UDP_SOCKET_RCVBUF:
+        print(f"⚠️  UDP receive buffer is {granted // 1024} KB (wanted {UDP_SOCKET_RCVBUF // 1024} KB)")
+        if sys.platform.startswith("linux"):
+            print(f"   Raise the limit with: sudo sysctl -w net.core.rmem_max={UDP_SOCKET_RCVBUF * 2}")
     
     try:
         sock.bind(("0.0.0.0", UDP_PORT))
@@ -201,146 +633,170 @@ def receive_pi_stats():
         print(f"❌ Could not bind UDP port {UDP_PORT}: {e}")
         return
     
+    receive = make_receiver(sock)
     while True:
         try:
-            data, addr = sock.recvfrom(8192)
-            stats = json.loads(data.decode())
-            stats["received_at"] = time.time()
-            stats["source_ip"] = addr[0]
-            state["pi"] = stats
-            
-            # Add to history (for graphs)
-            history_entry = {
-                "timestamp": stats.get("timestamp", time.time()),
-                "signal_dbm": stats.get("wifi", {}).get("signal_dbm"),
-                "link_quality_pct": stats.get("wifi", {}).get("link_quality_pct"),
-                "dropped_frames": stats.get("mpv", {}).get("dropped_frames"),
-                "cache_duration": stats.get("mpv", {}).get("cache_duration_sec"),
-                "cpu_temp": stats.get("system", {}).get("cpu_temp_c"),
-                "rx_rate_mbps": stats.get("rates", {}).get("rx_rate_mbps"),
-                "buffering": stats.get("mpv", {}).get("buffering", False),
-            }
-            state["pi_history"].append(history_entry)
-            
-            # Trim history
-            if len(state["pi_history"]) > MAX_HISTORY:
-                state["pi_history"] = state["pi_history"][-MAX_HISTORY:]
-            
-            # Add raw log entry (like terminal output)
-            wifi = stats.get("wifi", {})
-            mpv = stats.get("mpv", {})
-            system = stats.get("system", {})
-            rates = stats.get("rates", {})
-            
-            # Extract channel from path
-            channel = "N/A"
-            path = mpv.get("path", "")
-            if path:
-                import re
-                match = re.search(r'/channel/(\d+)', path)
-                if match:
-                    channel = match.group(1)
-            
-            risk_level = rates.get("risk_level", "ok")
-            risk_icon = {"ok": "✅", "warning": "⚠️", "danger": "🟠", "critical": "🔴"}.get(risk_level, "?")
-            
-            raw_entry = {
-                "timestamp": stats.get("timestamp", time.time()),
-                "icon": risk_icon,
-                "channel": channel,
-                "signal_dbm": wifi.get("signal_dbm"),
-                "quality_pct": wifi.get("link_quality_pct"),
-                "buffer_sec": mpv.get("cache_duration_sec"),
-                "rx_rate_mbps": rates.get("rx_rate_mbps"),
-                "video_bitrate_kbps": round(mpv.get("video_bitrate_mbps", 0) * 1000) if mpv.get("video_bitrate_mbps") else None,
-                "dropped_frames": mpv.get("dropped_frames"),
-                "cpu_temp": system.get("cpu_temp_c"),
-                "risk_level": risk_level,
-                "risk_reasons": rates.get("risk_reasons", []),
-            }
-            state["pi_raw_log"].append(raw_entry)
-            
-            # Trim raw log
-            if len(state["pi_raw_log"]) > MAX_RAW_LOG:
-                state["pi_raw_log"] = state["pi_raw_log"][-MAX_RAW_LOG:]
-            
-        except json.JSONDecodeError:
-            print("[Pi] Invalid JSON received")
-        except Exception as e:
+            packets = receive()
+        except OSError as e:
             print(f"[Pi] Receive error: {e}")
+            continue
+        
+        for data, addr in packets:
+            try:
+                handle_pi_packet(data, addr)
+            except ValueError:
+                print("[Pi] Invalid JSON received")
+            except Exception as e:
+                print(f"[Pi] Receive error: {e}")
 
 
 def check_alerts():
     """Generate alerts based on current state"""
-    while True:
-        try:
-            alerts = []
-            now = time.time()
-            
-            # Server alerts
-            server = state.get("server", {})
-            if server.get("cpu_percent", 0) > 85:
-                alerts.append({"level": "warning", "message": f"High CPU: {server['cpu_percent']:.0f}%"})
-            if server.get("memory_percent", 0) > 90:
-                alerts.append({"level": "warning", "message": f"High memory: {server['memory_percent']:.0f}%"})
-            if server.get("disk_percent", 0) > 90:
-                alerts.append({"level": "warning", "message": f"Low disk space: {100-server['disk_percent']:.0f}% free"})
-            if not server.get("ersatztv_running", True):
-                alerts.append({"level": "error", "message": "ErsatzTV not running"})
-            
-            # Docker alerts
-            docker = state.get("docker", {})
-            if not docker.get("npm_healthy", True):
-                alerts.append({"level": "error", "message": "NPM container down"})
-            if not docker.get("game_server_healthy", True):
-                alerts.append({"level": "warning", "message": "Game server container down"})
+    try:
+        alerts = []
+        now = time.time()
+        
+        # Server alerts
+        server = state.get("server", {})
+        if server.get("cpu_percent", 0) > 85:
+            alerts.append({"level": "warning", "message": f"High CPU: {server['cpu_percent']:.0f}%"})
+        if server.get("memory_percent", 0) > 90:
+            alerts.append({"level": "warning", "message": f"High memory: {server['memory_percent']:.0f}%"})
+        if server.get("disk_percent", 0) > 90:
+            alerts.append({"level": "warning", "message": f"Low disk space: {100-server['disk_percent']:.0f}% free"})
+        if not server.get("ersatztv_running", True):
+            alerts.append({"level": "error", "message": "ErsatzTV not running"})
+        
+        # Docker alerts
+        docker = state.get("docker", {})
+        if not docker.get("npm_healthy", True):
+            alerts.append({"level": "error", "message": "NPM container down"})
+        if not docker.get("game_server_healthy", True):
+            alerts.append({"level": "warning", "message": "Game server container down"})
+        
+        # Pi alerts
+        pi = state.get("pi", {})
+        pi_age = now - pi.get("received_at", 0)
+        if pi_age > 30:
+            alerts.append({"level": "error", "message": f"Pi not reporting ({int(pi_age)}s ago)"})
+        else:
+            # WiFi alerts
+            wifi = pi.get("wifi", {})
+            signal = wifi.get("signal_dbm")
+            if signal is not None and signal < -75:
+                alerts.append({"level": "warning", "message": f"Weak WiFi signal: {signal} dBm"})
             
-            # Pi alerts
-            pi = state.get("pi", {})
-            pi_age = now - pi.get("received_at", 0)
-            if pi_age > 30:
-                alerts.append({"level": "error", "message": f"Pi not reporting ({int(pi_age)}s ago)"})
-            else:
-                # WiFi alerts
-                wifi = pi.get("wifi", {})
-                signal = wifi.get("signal_dbm")
-                if signal is not None and signal < -75:
-                    alerts.append({"level": "warning", "message": f"Weak WiFi signal: {signal} dBm"})
-                
-                # Playback alerts
-                mpv = pi.get("mpv", {})
-                if mpv.get("buffering"):
-                    alerts.append({"level": "error", "message": "Pi is buffering!"})
-                
-                cache = mpv.get("cache_duration_sec")
-                if cache is not None and cache < 2:
-                    alerts.append({"level": "warning", "message": f"Low buffer: {cache}s"})
-                
-                # System alerts
-                system = pi.get("system", {})
-                if system.get("throttled_now"):
-                    alerts.append({"level": "error", "message": "Pi is thermal throttling!"})
-                if system.get("undervolt_now"):
-                    alerts.append({"level": "error", "message": "Pi undervoltage detected!"})
-                temp = system.get("cpu_temp_c")
-                if temp is not None and temp > 75:
-                    alerts.append({"level": "warning", "message": f"Pi running hot: {temp}°C"})
+            # Playback alerts
+            mpv = pi.get("mpv", {})
+            if mpv.get("buffering"):
+                alerts.append({"level": "error", "message": "Pi is buffering!"})
             
-            state["alerts"] = alerts
+            cache = mpv.get("cache_duration_sec")
+            if cache is not None and cache < 2:
+                alerts.append({"level": "warning", "message": f"Low buffer: {cache}s"})
             
-        except Exception as e:
-            print(f"[Alerts] Error: {e}")
+            # System alerts
+            system = pi.get("system", {})
+            if system.get("throttled_now"):
+                alerts.append({"level": "error", "message": "Pi is thermal throttling!"})
+            if system.get("undervolt_now"):
+                alerts.append({"level": "error", "message": "Pi undervoltage detected!"})
+            temp = system.get("cpu_temp_c")
+            if temp is not None and temp > 75:
+                alerts.append({"level": "warning", "message": f"Pi running hot: {temp}°C"})
+        
+        # Republishing an identical list would only churn the ETag
+        if alerts != state["alerts"]:
+            publish("alerts", alerts)
         
-        time.sleep(5)
+    except Exception as e:
+        print(f"[Alerts] Error: {e}")
+
+
+def watch_alerts():
+    """Re-check alerts whenever a collector publishes.
+
+    The timeout keeps time-based alerts (Pi stopped reporting) firing
+    even when nothing is being published.
+    """
+    while True:
+        with state_changed:
+            state_changed.wait(timeout=ALERT_POLL_SECONDS)
+        check_alerts()
+
+
+def run_every(scheduler, interval, collector):
+    """Run collector now and then every interval seconds on a shared scheduler.
+
+    Deadlines are absolute, so a slow run shortens the next wait instead
+    of pushing every later run back.
+    """
+    def tick(due):
+        try:
+            collector()
+        except Exception as e:
+            print(f"[Scheduler] {collector.__name__} error: {e}")
+        next_due = max(due + interval, time.monotonic())
+        scheduler.enterabs(next_due, 0, tick, (next_due,))
+    
+    now = time.monotonic()
+    scheduler.enterabs(now, 0, tick, (now,))
+
+
+def run_pollers():
+    """Drive every polling collector from one timer queue on one thread"""
+    scheduler = sched.scheduler(time.monotonic, time.sleep)
+    # Disk first so the first server sample already includes it
+    run_every(scheduler, DISK_POLL_SECONDS, sample_disk_usage)
+    run_every(scheduler, SERVER_POLL_SECONDS, collect_server_stats)
+    run_every(scheduler, NETWORK_POLL_SECONDS, collect_network_stats)
+    scheduler.run()
 
 
 # ============== API ENDPOINTS ==============
 
+cache = Cache(app, config={
+    "CACHE_TYPE": "SimpleCache",
+    "CACHE_DEFAULT_TIMEOUT": API_CACHE_SECONDS,
+}) if Cache is not None else None
+
+
+def cached_view(view):
+    """Memoize a view per query string for API_CACHE_SECONDS (no-op without Flask-Caching)"""
+    if cache is None:
+        return view
+    return cache.cached(query_string=True)(view)
+
+
 @app.route('/api/stats')
 def api_stats():
-    """Return all collected stats"""
-    state["last_update"] = time.time()
-    return jsonify(state)
+    """Return all collected stats
+
+    ?fields=pi,server limits the response to those sections. Responses
+    carry an ETag of the state version, so unchanged polls get a 304.
+    """
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    
+    # Read the version before snapshotting: a publish in between only
+    # makes the body newer than its tag, never staler
+    etag = str(_state_version)
+    if fields:
+        etag += "-" + ",".join(sorted(fields))
+    if request.if_none_match.contains(etag):
+        return '', 304
+    
+    # Shallow snapshot: sections are swapped whole, so copying the top
+    # level (plus the two growing deques) is enough for a consistent view
+    snapshot = dict(state)
+    if fields:
+        snapshot = {k: snapshot[k] for k in fields if k in snapshot}
+    for key in ("pi_history", "pi_raw_log"):
+        if key in snapshot:
+            snapshot[key] = list(snapshot[key])
+    
+    resp = jsonify(snapshot)
+    resp.set_etag(etag)
+    return resp
 
 
 @app.route('/api/pi')
@@ -350,28 +806,18 @@ def api_pi():
 
 
 @app.route('/api/pi/history')
+@cached_view
 def api_pi_history():
     """Return Pi history for graphs"""
-    return jsonify(state.get("pi_history", []))
+    return jsonify(list(state["pi_history"]))
 
 
 @app.route('/api/health')
 def api_health():
     """Quick health summary"""
-    now = time.time()
-    pi = state.get("pi", {})
-    pi_age = now - pi.get("received_at", 0)
-    
-    return jsonify({
-        "server_ok": state.get("server", {}).get("cpu_percent", 100) < 90,
-        "docker_npm_ok": state.get("docker", {}).get("npm_healthy", False),
-        "docker_game_ok": state.get("docker", {}).get("game_server_healthy", False),
-        "ersatztv_ok": state.get("server", {}).get("ersatztv_running", False),
-        "pi_connected": pi_age < 30,
-        "pi_latency_ms": state.get("network", {}).get("pi_latency_ms"),
-        "pi_buffering": pi.get("mpv", {}).get("buffering", False),
-        "alert_count": len(state.get("alerts", [])),
-    })
+    # Prebuilt by publish(); only the Pi's age depends on the request time
+    summary, pi_received_at = _health
+    return jsonify(dict(summary, pi_connected=time.time() - pi_received_at < 30))
 
 
 @app.route('/api/alerts')
@@ -387,12 +833,14 @@ def api_rawlog():
     limit = request.args.get('limit', 100, type=int)
     offset = request.args.get('offset', 0, type=int)
     
-    raw_log = state.get("pi_raw_log", [])
+    raw_log = state["pi_raw_log"]
     total = len(raw_log)
     
-    # Return newest first, with pagination
-    reversed_log = list(reversed(raw_log))
-    page = reversed_log[offset:offset + limit]
+    # Return newest first, with pagination. reversed() on a deque is lazy,
+    # so only offset + limit entries are walked (islice rejects negatives)
+    offset = max(offset, 0)
+    limit = max(limit, 0)
+    page = list(itertools.islice(reversed(raw_log), offset, offset + limit))
     
     return jsonify({
         "total": total,
@@ -403,6 +851,7 @@ def api_rawlog():
 
 
 @app.route('/api/history/stats')
+@cached_view
 def api_history_stats():
     """Calculate min/avg/max from history over a time range"""
     # Get time range in minutes (default 60 = 1 hour)
@@ -411,12 +860,22 @@ def api_history_stats():
     now = time.time()
     cutoff = now - (minutes * 60)
     
-    raw_log = state.get("pi_raw_log", [])
-    
-    # Filter to time range
-    filtered = [e for e in raw_log if e.get("timestamp", 0) >= cutoff]
+    # Bucket keys are sorted, so bisect straight to the first minute in
+    # range. Closed buckets fully inside it contribute their precomputed
+    # aggregate; the live bucket and the one straddling the cutoff are
+    # summarized from their entries.
+    buckets = list(_buckets)
+    start = bisect.bisect_left(buckets, int(cutoff // BUCKET_SECONDS), key=lambda b: b["key"])
+    total = aggregate_entries(())
+    for bucket in itertools.islice(buckets, start, None):
+        agg = bucket["agg"]
+        if agg is not None and agg["from"] >= cutoff:
+            merge_aggregates(total, agg)
+        else:
+            entries = [e for e in list(bucket["entries"]) if e["timestamp"] >= cutoff]
+            merge_aggregates(total, aggregate_entries(entries))
     
-    if not filtered:
+    if not total["samples"]:
         return jsonify({
             "minutes": minutes,
             "samples": 0,
@@ -426,40 +885,33 @@ def api_history_stats():
             "drops": {}
         })
     
-    # Extract values (filter out None)
-    buffers = [e["buffer_sec"] for e in filtered if e.get("buffer_sec") is not None]
-    signals = [e["signal_dbm"] for e in filtered if e.get("signal_dbm") is not None]
-    bandwidths = [e["rx_rate_mbps"] for e in filtered if e.get("rx_rate_mbps") is not None]
-    drops = [e["dropped_frames"] for e in filtered if e.get("dropped_frames") is not None]
-    
-    def calc_stats(values):
-        if not values:
+    def calc_stats(metric):
+        count, value_sum, value_min, value_max = metric
+        if not count:
             return {}
         return {
-            "min": round(min(values), 2),
-            "max": round(max(values), 2),
-            "avg": round(sum(values) / len(values), 2),
-            "count": len(values)
+            "min": round(value_min, 2),
+            "max": round(value_max, 2),
+            "avg": round(value_sum / count, 2),
+            "count": count
         }
     
-    # Count risk events
-    warnings = len([e for e in filtered if e.get("risk_level") == "warning"])
-    dangers = len([e for e in filtered if e.get("risk_level") in ["danger", "critical"]])
+    drops = total["drops"]
     
     return jsonify({
         "minutes": minutes,
-        "samples": len(filtered),
+        "samples": total["samples"],
         "time_range": {
-            "from": min(e["timestamp"] for e in filtered),
-            "to": max(e["timestamp"] for e in filtered)
+            "from": total["from"],
+            "to": total["to"]
         },
-        "buffer": calc_stats(buffers),
-        "signal": calc_stats(signals),
-        "bandwidth": calc_stats(bandwidths),
-        "drops": calc_stats(drops) if drops else {"min": 0, "max": 0, "total": 0},
+        "buffer": calc_stats(total["buffer"]),
+        "signal": calc_stats(total["signal"]),
+        "bandwidth": calc_stats(total["bandwidth"]),
+        "drops": calc_stats(drops) if drops[0] else {"min": 0, "max": 0, "total": 0},
         "risk_events": {
-            "warnings": warnings,
-            "dangers": dangers
+            "warnings": total["warnings"],
+            "dangers": total["dangers"]
         }
     })
 
@@ -497,12 +949,13 @@ def main():
         print("   Put dashboard.html in this folder!")
     
     # Start collector threads
+    # Server and network polling share one scheduler thread; Docker and the
+    # Pi receiver block on their own event streams, alerts on state changes
     threads = [
-        ("Server Stats", collect_server_stats),
+        ("Pollers (server, network)", run_pollers),
         ("Docker Stats", collect_docker_stats),
-        ("Network Stats", collect_network_stats),
         ("Pi Receiver", receive_pi_stats),
-        ("Alert Checker", check_alerts),
+        ("Alert Checker", watch_alerts),
     ]
     
     for name, target in threads:
@@ -511,10 +964,13 @@ def main():
         print(f"✅ Started: {name}")
     
     print("-" * 60)
-    print("🌐 Starting web server...")
-    
-    # Run Flask (use threaded for concurrent requests)
-    app.run(host='0.0.0.0', port=DASHBOARD_PORT, debug=False, threaded=True)
+    if serve is not None:
+        print("🌐 Starting web server (waitress)...")
+        serve(app, host='0.0.0.0', port=DASHBOARD_PORT, threads=8)
+    else:
+        print("🌐 Starting web server (Flask dev server, pip install waitress for production)...")
+        # Run Flask (use threaded for concurrent requests)
+        app.run(host='0.0.0.0', port=DASHBOARD_PORT, debug=False, threaded=True)
 
 
 if __name__ == '__main__':
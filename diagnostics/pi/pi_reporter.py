@@ -12,7 +12,7 @@ Now with:
 Sends stats via UDP to the collector on the streaming PC.
 Run on YlemPi alongside tv_control.py
 
-Install: No dependencies needed (uses stdlib only)
+Install: No dependencies needed (uses stdlib only; orjson and pyroute2 are used if present)
 Usage: python3 pi_reporter.py
 """
 import socket
@@ -21,7 +21,32 @@ import subprocess
 import time
 import re
 import os
+import fcntl
+import struct
+import math
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional: orjson serializes reports faster and returns bytes directly
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    dumps = orjson.dumps
+else:
+    def dumps(obj):
+        return json.dumps(obj).encode()
+
+# Optional: pyroute2 reads WiFi stats over netlink instead of forking iwconfig/iw
+try:
+    from pyroute2 import IW
+except ImportError:
+    IW = None
+
+# One decoder for every MPV reply line
+_json_decoder = json.JSONDecoder()
 
 # === CONFIGURATION ===
 COLLECTOR_HOST = "__HOST_IP__"  # Replace with your streaming PC's IP
@@ -37,78 +62,292 @@ SIGNAL_WEAK_DBM = -70             # Signal weaker than this = potential issues
 SIGNAL_BAD_DBM = -75              # Signal weaker than this = likely issues
 MIN_BITRATE_MBPS = 5.0            # Minimum expected stream bitrate
 
+# Risk severities, combined with max(); RISK_LEVELS maps them to report names
+RISK_OK, RISK_WARNING, RISK_DANGER, RISK_CRITICAL = range(4)
+RISK_LEVELS = ("ok", "warning", "danger", "critical")
+_RISK_ICON = {"ok": "✅", "warning": "⚠️ ", "danger": "🟠", "critical": "🔴"}
+
+# === PARSER PATTERNS ===
+# One alternation per tool so its output is scanned once; group names are
+# the fields, and only the first occurrence of each is kept
+_RE_IWCONFIG = re.compile(
+    r'ESSID:"(?P<essid>[^"]*)"'
+    r'|Signal level[=:](?P<signal>-?\d+)'
+    r'|Link Quality[=:](?P<quality>\d+)/(?P<quality_max>\d+)'
+    r'|Bit Rate[=:](?P<bitrate>\d+\.?\d*)\s*Mb'
+    r'|Frequency[=:](?P<frequency>\d+\.?\d*)\s*GHz'
+)
+_RE_IW_STATION = re.compile(
+    r'tx retries:\s*(?P<tx_retries>\d+)'
+    r'|tx failed:\s*(?P<tx_failed>\d+)'
+    r'|signal avg:\s*(?P<signal_avg>-?\d+)'
+    r'|beacon loss:\s*(?P<beacon_loss>\d+)'
+)
+_RE_TEMP = re.compile(r'temp=([\d.]+)')
+_RE_THROTTLED = re.compile(r'throttled=(0x[0-9a-fA-F]+)')
+_RE_CLOCK = re.compile(r'=(\d+)')
+_RE_CHANNEL = re.compile(r'/channel/(\d+)')
+
 
-def run_cmd(cmd):
-    """Run shell command and return output"""
+def run_cmd(argv):
+    """Run an external command (argv list, no shell) and return output"""
     try:
         result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, timeout=5
+            argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, timeout=5
         )
         return result.stdout.strip()
     except Exception:
         return None
 
 
-def mpv_get(property_name):
-    """Get MPV property via JSON IPC socket"""
-    if not os.path.exists(MPV_SOCKET):
+def _read(path):
+    """Read a /proc or /sys file directly, without spawning a process"""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
         return None
+
+
+# Persistent MPV IPC connection, opened lazily and dropped on any error
+_mpv_sock = None
+_mpv_file = None
+# Encoded get_property command per property name, built once. Each name keeps
+# a fixed request_id; that is safe because any error drops the connection, so
+# no unanswered request survives into the next round-trip.
+_mpv_commands = {}
+
+
+def mpv_disconnect():
+    """Close the MPV IPC connection so the next query reconnects"""
+    global _mpv_sock, _mpv_file
+    if _mpv_file is not None:
+        try:
+            _mpv_file.close()
+        except OSError:
+            pass
+    if _mpv_sock is not None:
+        _mpv_sock.close()
+    _mpv_sock = None
+    _mpv_file = None
+
+
+def mpv_connect():
+    """Connect to the MPV IPC socket (keeps one connection across queries)"""
+    global _mpv_sock, _mpv_file
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1.0)
+    try:
+        sock.connect(MPV_SOCKET)
+    except OSError:
+        sock.close()
+        raise
+    _mpv_sock = sock
+    # Read-only text view for line-by-line replies; requests go through
+    # sock.sendall so writes never disturb the read buffer
+    _mpv_file = sock.makefile("r", encoding="utf-8", newline="\n")
+
+
+def mpv_command(property_name):
+    """Return (request_id, encoded command bytes) for a get_property request"""
+    cached = _mpv_commands.get(property_name)
+    if cached is None:
+        request_id = len(_mpv_commands) + 1
+        line = json.dumps({"command": ["get_property", property_name], "request_id": request_id}) + "\n"
+        cached = _mpv_commands[property_name] = (request_id, line.encode())
+    return cached
+
+
+def mpv_get_many(property_names):
+    """Get several MPV properties in one pipelined round-trip over the IPC socket
+
+    Returns {property: value} for every property MPV answered successfully.
+    """
+    values = {}
+    if not os.path.exists(MPV_SOCKET):
+        mpv_disconnect()
+        return values
     
-    # Use JSON IPC protocol
-    cmd = f'echo \'{{"command": ["get_property", "{property_name}"]}}\' | socat - {MPV_SOCKET} 2>/dev/null'
-    result = run_cmd(cmd)
-    
-    if not result:
+    try:
+        if _mpv_file is None:
+            mpv_connect()
+
+        # Write every request at once, then collect replies by request_id
+        pending = {}
+        commands = []
+        for name in property_names:
+            request_id, command = mpv_command(name)
+            pending[request_id] = name
+            commands.append(command)
+        _mpv_sock.sendall(b"".join(commands))
+
+        # MPV interleaves async event lines (no request_id); skip those
+        while pending:
+            line = _mpv_file.readline()
+            if not line:
+                raise ConnectionError("MPV closed the IPC socket")
+            data = _json_decoder.decode(line)
+            name = pending.pop(data.get("request_id"), None)
+            if name is not None and data.get("error") == "success":
+                values[name] = data.get("data")
+    except (OSError, ValueError):
+        # Timeout, MPV restarted, or garbled reply: reconnect next time
+        mpv_disconnect()
+    
+    return values
+
+
+def mpv_get(property_name):
+    """Get MPV property via JSON IPC socket"""
+    return mpv_get_many((property_name,)).get(property_name)
+
+
+def first_matches(pattern, text):
+    """Single finditer pass: {group: value} for the first match of each group"""
+    found = {}
+    for match in pattern.finditer(text):
+        name = match.lastgroup
+        if name == "quality_max":
+            name = "quality"
+        if name not in found:
+            found[name] = match
+    return found
+
+
+# Persistent nl80211 socket, opened lazily; None until first use
+_iw = None
+
+
+def get_wifi_stats_netlink():
+    """Get WiFi stats straight from nl80211 (same source iwconfig/iw read)
+
+    Returns None when pyroute2 is missing or the query fails, so the caller
+    can fall back to the command-line tools.
+    """
+    global _iw
+    if IW is None:
         return None
-    
     try:
-        data = json.loads(result)
-        if data.get("error") == "success":
-            return data.get("data")
-    except (json.JSONDecodeError, TypeError):
-        pass
-    
-    return None
+        if _iw is None:
+            _iw = IW()
+        ifindex = socket.if_nametoindex(WIFI_INTERFACE)
+        stats = {}
 
+        for msg in _iw.get_interface_by_ifindex(ifindex):
+            essid = msg.get_attr("NL80211_ATTR_SSID")
+            if essid is not None:
+                stats["essid"] = essid
+            freq = msg.get_attr("NL80211_ATTR_WIPHY_FREQ")
+            if freq:
+                stats["frequency_ghz"] = round(freq / 1000, 3)
 
-def get_wifi_stats():
-    """Get detailed WiFi diagnostics"""
+        # Client mode: the first station is the access point we're joined to
+        for msg in _iw.get_stations(ifindex):
+            info = msg.get_attr("NL80211_ATTR_STA_INFO")
+            if info is None:
+                continue
+            signal = info.get_attr("NL80211_STA_INFO_SIGNAL")
+            if signal is not None:
+                stats["signal_dbm"] = signal
+                # Same mapping cfg80211 uses for iwconfig's Link Quality
+                quality = min(max(signal + 110, 0), 70)
+                stats["link_quality"] = quality
+                stats["link_quality_max"] = 70
+                stats["link_quality_pct"] = round(quality / 70 * 100)
+            rate = info.get_attr("NL80211_STA_INFO_TX_BITRATE")
+            if rate is not None:
+                bitrate = rate.get_attr("NL80211_RATE_INFO_BITRATE32") or rate.get_attr("NL80211_RATE_INFO_BITRATE")
+                if bitrate:
+                    stats["bitrate_mbps"] = bitrate / 10  # units of 100 kbit/s
+            for attr, key in (
+                ("NL80211_STA_INFO_TX_RETRIES", "tx_retries"),
+                ("NL80211_STA_INFO_TX_FAILED", "tx_failed"),
+                ("NL80211_STA_INFO_SIGNAL_AVG", "signal_avg_dbm"),
+                ("NL80211_STA_INFO_BEACON_LOSS", "beacon_loss"),
+            ):
+                value = info.get_attr(attr)
+                if value is not None:
+                    stats[key] = value
+            break
+
+        return stats
+    except Exception:
+        # Driver without nl80211, interface gone, socket error: reopen next time
+        if _iw is not None:
+            try:
+                _iw.close()
+            except Exception:
+                pass
+        _iw = None
+        return None
+
+
+def get_wifi_stats_cli():
+    """Get WiFi stats by parsing iwconfig and iw station dump output"""
     stats = {}
-    
+
     # === iwconfig - signal, quality, bitrate ===
-    iwconfig = run_cmd(f"iwconfig {WIFI_INTERFACE} 2>/dev/null")
+    iwconfig = run_cmd(["iwconfig", WIFI_INTERFACE])
     if iwconfig:
+        found = first_matches(_RE_IWCONFIG, iwconfig)
+
         # ESSID (network name)
-        match = re.search(r'ESSID:"([^"]*)"', iwconfig)
-        if match:
-            stats["essid"] = match.group(1)
-        
+        if "essid" in found:
+            stats["essid"] = found["essid"].group("essid")
+
         # Signal level: -45 dBm (or Signal level=XX/100)
-        match = re.search(r'Signal level[=:](-?\d+)', iwconfig)
-        if match:
-            stats["signal_dbm"] = int(match.group(1))
-        
+        if "signal" in found:
+            stats["signal_dbm"] = int(found["signal"].group("signal"))
+
         # Link Quality: 70/70
-        match = re.search(r'Link Quality[=:](\d+)/(\d+)', iwconfig)
-        if match:
-            quality = int(match.group(1))
-            quality_max = int(match.group(2))
+        if "quality" in found:
+            quality = int(found["quality"].group("quality"))
+            quality_max = int(found["quality"].group("quality_max"))
             stats["link_quality"] = quality
             stats["link_quality_max"] = quality_max
             stats["link_quality_pct"] = round(quality / quality_max * 100) if quality_max > 0 else 0
-        
+
         # Bit Rate: 72.2 Mb/s
-        match = re.search(r'Bit Rate[=:](\d+\.?\d*)\s*Mb', iwconfig)
-        if match:
-            stats["bitrate_mbps"] = float(match.group(1))
-        
+        if "bitrate" in found:
+            stats["bitrate_mbps"] = float(found["bitrate"].group("bitrate"))
+
         # Frequency
-        match = re.search(r'Frequency[=:](\d+\.?\d*)\s*GHz', iwconfig)
-        if match:
-            stats["frequency_ghz"] = float(match.group(1))
-    
+        if "frequency" in found:
+            stats["frequency_ghz"] = float(found["frequency"].group("frequency"))
+
+    # === iw station dump - retries, failures ===
+    iw_station = run_cmd(["iw", "dev", WIFI_INTERFACE, "station", "dump"])
+    if iw_station:
+        found = first_matches(_RE_IW_STATION, iw_station)
+
+        # tx retries
+        if "tx_retries" in found:
+            stats["tx_retries"] = int(found["tx_retries"].group("tx_retries"))
+
+        # tx failed
+        if "tx_failed" in found:
+            stats["tx_failed"] = int(found["tx_failed"].group("tx_failed"))
+
+        # signal avg (sometimes more stable than instant)
+        if "signal_avg" in found:
+            stats["signal_avg_dbm"] = int(found["signal_avg"].group("signal_avg"))
+
+        # beacon loss count
+        if "beacon_loss" in found:
+            stats["beacon_loss"] = int(found["beacon_loss"].group("beacon_loss"))
+
+    return stats
+
+
+def get_wifi_stats():
+    """Get detailed WiFi diagnostics"""
+    stats = get_wifi_stats_netlink()
+    if stats is None:
+        stats = get_wifi_stats_cli()
+
     # === /proc/net/wireless - additional stats ===
-    wireless = run_cmd("cat /proc/net/wireless 2>/dev/null")
+    wireless = _read("/proc/net/wireless")
     if wireless:
         lines = wireless.strip().split('\n')
         if len(lines) >= 3:
@@ -120,140 +359,173 @@ def get_wifi_stats():
                 if noise != -256:
                     stats["noise_dbm"] = noise
     
-    # === iw station dump - retries, failures ===
-    iw_station = run_cmd(f"iw dev {WIFI_INTERFACE} station dump 2>/dev/null")
-    if iw_station:
-        # tx retries
-        match = re.search(r'tx retries:\s*(\d+)', iw_station)
-        if match:
-            stats["tx_retries"] = int(match.group(1))
-        
-        # tx failed
-        match = re.search(r'tx failed:\s*(\d+)', iw_station)
-        if match:
-            stats["tx_failed"] = int(match.group(1))
-        
-        # signal avg (sometimes more stable than instant)
-        match = re.search(r'signal avg:\s*(-?\d+)', iw_station)
-        if match:
-            stats["signal_avg_dbm"] = int(match.group(1))
-        
-        # beacon loss count
-        match = re.search(r'beacon loss:\s*(\d+)', iw_station)
-        if match:
-            stats["beacon_loss"] = int(match.group(1))
-    
     return stats
 
 
+# Properties read by get_mpv_stats(), fetched together in one IPC round-trip
+MPV_PROPERTIES = (
+    "path",
+    "pause",
+    "playback-time",
+    "vo-dropped-frame-count",
+    "decoder-frame-drop-count",
+    "estimated-vf-fps",
+    "paused-for-cache",
+    "demuxer-cache-duration",
+    "cache-speed",
+    "avsync",
+    "video-bitrate",
+)
+
+
+def _num(value, ndigits=None, scale=1):
+    """Scale and round a numeric MPV value (to an int without ndigits)
+
+    Returns None for anything that is not a real number.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = value * scale
+        return round(value, ndigits) if ndigits is not None else int(value)
+    return None
+
+
 def get_mpv_stats():
     """Get MPV playback diagnostics"""
     stats = {}
+    values = mpv_get_many(MPV_PROPERTIES)
+
+    def put(key, value):
+        if value is not None:
+            stats[key] = value
     
     # === Basic playback info ===
-    stats["path"] = mpv_get("path")
-    stats["paused"] = mpv_get("pause")
+    stats["path"] = values.get("path")
+    stats["paused"] = values.get("pause")
     
     # Playback time
-    pt = mpv_get("playback-time")
-    if pt is not None:
-        stats["playback_time"] = round(pt, 1) if isinstance(pt, (int, float)) else pt
+    put("playback_time", _num(values.get("playback-time"), 1))
     
     # === Frame drops - KEY METRICS ===
-    dropped = mpv_get("vo-dropped-frame-count")
-    if dropped is not None:
-        stats["dropped_frames"] = int(dropped) if isinstance(dropped, (int, float)) else dropped
-    
-    decoder_dropped = mpv_get("decoder-frame-drop-count")
-    if decoder_dropped is not None:
-        stats["decoder_dropped"] = int(decoder_dropped) if isinstance(decoder_dropped, (int, float)) else decoder_dropped
+    put("dropped_frames", _num(values.get("vo-dropped-frame-count")))
+    put("decoder_dropped", _num(values.get("decoder-frame-drop-count")))
     
     # FPS
-    fps = mpv_get("estimated-vf-fps")
-    if fps is not None:
-        stats["fps"] = round(fps, 2) if isinstance(fps, (int, float)) else fps
+    put("fps", _num(values.get("estimated-vf-fps"), 2))
     
     # === Buffer/cache state - CRITICAL for streaming ===
     # paused-for-cache: true means currently buffering/stalled!
-    cache_pause = mpv_get("paused-for-cache")
+    cache_pause = values.get("paused-for-cache")
     stats["buffering"] = cache_pause is True
     
     # Demuxer cache duration (seconds of video buffered ahead)
-    cache_dur = mpv_get("demuxer-cache-duration")
-    if cache_dur is not None:
-        stats["cache_duration_sec"] = round(cache_dur, 1) if isinstance(cache_dur, (int, float)) else cache_dur
+    put("cache_duration_sec", _num(values.get("demuxer-cache-duration"), 1))
     
-    # Cache speed (bytes/sec coming in)
-    cache_speed = mpv_get("cache-speed")
-    if cache_speed is not None and isinstance(cache_speed, (int, float)):
-        # Convert to Mbps
-        stats["cache_speed_mbps"] = round(cache_speed * 8 / 1_000_000, 2)
+    # Cache speed (bytes/sec coming in), converted to Mbps
+    put("cache_speed_mbps", _num(values.get("cache-speed"), 2, 8 / 1_000_000))
     
     # === A/V sync ===
-    avsync = mpv_get("avsync")
-    if avsync is not None and isinstance(avsync, (int, float)):
-        stats["av_sync_ms"] = round(avsync * 1000, 1)
+    put("av_sync_ms", _num(values.get("avsync"), 1, 1000))
     
     # === Bitrates ===
-    vbr = mpv_get("video-bitrate")
-    if vbr is not None and isinstance(vbr, (int, float)):
-        stats["video_bitrate_mbps"] = round(vbr / 1_000_000, 2)
+    put("video_bitrate_mbps", _num(values.get("video-bitrate"), 2, 1 / 1_000_000))
     
     return stats
 
 
+# VideoCore mailbox property interface (what vcgencmd uses under the hood)
+VCIO_DEVICE = "/dev/vcio"
+VCIO_IOCTL_MBOX_PROPERTY = (3 << 30) | (struct.calcsize("P") << 16) | (100 << 8)  # _IOWR(100, 0, char *)
+VCIO_TAG_GET_THROTTLED = 0x00030046
+VCIO_RESPONSE_OK = 0x80000000
+
+
+def get_throttled_flags():
+    """Read the firmware throttle bit flags, via /dev/vcio or vcgencmd"""
+    # Buffer: size, request code, tag, value size, tag request code, value, end tag
+    buf = bytearray(struct.pack("=7I", 28, 0, VCIO_TAG_GET_THROTTLED, 4, 0, 0, 0))
+    try:
+        with open(VCIO_DEVICE, "rb") as vcio:
+            fcntl.ioctl(vcio, VCIO_IOCTL_MBOX_PROPERTY, buf, True)
+        _, response, _, _, _, value, _ = struct.unpack("=7I", buf)
+        if response == VCIO_RESPONSE_OK:
+            return value
+    except OSError:
+        pass
+
+    throttle = run_cmd(["vcgencmd", "get_throttled"])
+    if throttle:
+        match = _RE_THROTTLED.search(throttle)
+        if match:
+            return int(match.group(1), 16)
+    return None
+
+
 def get_system_stats():
     """Get Pi system stats"""
     stats = {}
-    
+
     # === CPU Temperature ===
-    temp = run_cmd("vcgencmd measure_temp")
+    temp = _read("/sys/class/thermal/thermal_zone0/temp")
     if temp:
-        match = re.search(r'temp=([\d.]+)', temp)
-        if match:
-            stats["cpu_temp_c"] = float(match.group(1))
-    
+        try:
+            stats["cpu_temp_c"] = round(int(temp) / 1000, 1)
+        except ValueError:
+            pass
+    else:
+        temp = run_cmd(["vcgencmd", "measure_temp"])
+        if temp:
+            match = _RE_TEMP.search(temp)
+            if match:
+                stats["cpu_temp_c"] = float(match.group(1))
+
     # === Throttling state - IMPORTANT! ===
-    throttle = run_cmd("vcgencmd get_throttled")
-    if throttle:
-        match = re.search(r'throttled=(0x[0-9a-fA-F]+)', throttle)
-        if match:
-            val = int(match.group(1), 16)
-            # Bit flags:
-            # 0: Under-voltage detected
-            # 1: Arm frequency capped
-            # 2: Currently throttled
-            # 16: Under-voltage has occurred
-            # 17: Arm frequency capping has occurred
-            # 18: Throttling has occurred
-            stats["throttle_flags"] = hex(val)
-            stats["undervolt_now"] = bool(val & 0x1)
-            stats["freq_capped_now"] = bool(val & 0x2)
-            stats["throttled_now"] = bool(val & 0x4)
-            stats["undervolt_occurred"] = bool(val & 0x10000)
-            stats["throttled_occurred"] = bool(val & 0x40000)
+    val = get_throttled_flags()
+    if val is not None:
+        # Bit flags:
+        # 0: Under-voltage detected
+        # 1: Arm frequency capped
+        # 2: Currently throttled
+        # 16: Under-voltage has occurred
+        # 17: Arm frequency capping has occurred
+        # 18: Throttling has occurred
+        stats["throttle_flags"] = hex(val)
+        stats["undervolt_now"] = bool(val & 0x1)
+        stats["freq_capped_now"] = bool(val & 0x2)
+        stats["throttled_now"] = bool(val & 0x4)
+        stats["undervolt_occurred"] = bool(val & 0x10000)
+        stats["throttled_occurred"] = bool(val & 0x40000)
     
     # === CPU Frequency ===
-    freq = run_cmd("vcgencmd measure_clock arm")
+    freq = _read("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq")
     if freq:
-        match = re.search(r'=(\d+)', freq)
-        if match:
-            stats["cpu_freq_mhz"] = int(match.group(1)) // 1_000_000
-    
+        try:
+            stats["cpu_freq_mhz"] = int(freq) // 1000
+        except ValueError:
+            pass
+    else:
+        freq = run_cmd(["vcgencmd", "measure_clock", "arm"])
+        if freq:
+            match = _RE_CLOCK.search(freq)
+            if match:
+                stats["cpu_freq_mhz"] = int(match.group(1)) // 1_000_000
+
     # === Memory ===
-    mem = run_cmd("free -m")
-    if mem:
-        lines = mem.strip().split('\n')
-        for line in lines:
-            if line.startswith('Mem:'):
-                parts = line.split()
-                if len(parts) >= 3:
-                    stats["mem_total_mb"] = int(parts[1])
-                    stats["mem_used_mb"] = int(parts[2])
-                    stats["mem_pct"] = round(int(parts[2]) / int(parts[1]) * 100)
+    meminfo = _read("/proc/meminfo")
+    if meminfo:
+        mem = {}
+        for line in meminfo.splitlines():
+            key, _, value = line.partition(':')
+            if key in ("MemTotal", "MemAvailable"):
+                mem[key] = int(value.split()[0]) // 1024
+        total = mem.get("MemTotal")
+        available = mem.get("MemAvailable")
+        if total and available is not None:
+            stats["mem_total_mb"] = total
+            stats["mem_used_mb"] = total - available
+            stats["mem_pct"] = round((total - available) / total * 100)
     
     # === Uptime ===
-    uptime = run_cmd("cat /proc/uptime")
+    uptime = _read("/proc/uptime")
     if uptime:
         parts = uptime.split()
         if parts:
@@ -280,16 +552,68 @@ def get_network_stats():
     ]
     
     for filename, key in metrics:
-        value = run_cmd(f"cat {base}/{filename} 2>/dev/null")
+        value = _read(f"{base}/{filename}")
         if value:
             try:
-                stats[key] = int(value)
+                stats[key] = int(value.strip())
             except ValueError:
                 pass
     
     return stats
 
 
+class RollingWindow:
+    """Fixed-size rolling window with O(1) min/max/avg reads
+
+    Keeps a running sum plus monotonic deques of (index, value) so each
+    append is amortized O(1) instead of rescanning the window.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+        self._mins = deque()
+        self._maxs = deque()
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+        index = self.count
+        self.count += 1
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((index, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((index, value))
+
+        # Drop extremes that slid out of the window
+        oldest = index - self.size
+        if self._mins[0][0] <= oldest:
+            self._mins.popleft()
+        if self._maxs[0][0] <= oldest:
+            self._maxs.popleft()
+
+    @property
+    def min(self):
+        return self._mins[0][1]
+
+    @property
+    def max(self):
+        return self._maxs[0][1]
+
+    @property
+    def avg(self):
+        return self.total / len(self.values)
+
+
 class RateCalculator:
     """Calculate rates between samples"""
     def __init__(self):
@@ -298,18 +622,18 @@ class RateCalculator:
         self.last_tx_retries = 0
         self.last_dropped = 0
         # Rolling history for min/max tracking
-        self.buffer_history = deque(maxlen=30)  # Last 30 samples (~1 min at 2s intervals)
-        self.signal_history = deque(maxlen=30)
-        self.rx_rate_history = deque(maxlen=30)
+        self.buffer_history = RollingWindow(30)  # Last 30 samples (~1 min at 2s intervals)
+        self.signal_history = RollingWindow(30)
+        self.rx_rate_history = RollingWindow(30)
         # Event counters
         self.buffer_danger_count = 0
         self.buffer_critical_count = 0
-        self.pixelation_risk_events = []
-    
+        self.pixelation_risk_events = deque(maxlen=100)  # Last 100 events
+
     def calculate(self, network, wifi, mpv):
         """Return calculated rates and risk assessments"""
         rates = {}
-        now = time.time()
+        now = time.monotonic()  # Immune to wall-clock jumps (NTP sync after boot)
         elapsed = now - self.last_time if self.last_time > 0 else 0
         
         if elapsed > 0:
@@ -349,66 +673,63 @@ class RateCalculator:
         
         # === CALCULATE STATS ===
         if self.buffer_history:
-            rates["buffer_min"] = round(min(self.buffer_history), 1)
-            rates["buffer_max"] = round(max(self.buffer_history), 1)
-            rates["buffer_avg"] = round(sum(self.buffer_history) / len(self.buffer_history), 1)
-        
+            rates["buffer_min"] = round(self.buffer_history.min, 1)
+            rates["buffer_max"] = round(self.buffer_history.max, 1)
+            rates["buffer_avg"] = round(self.buffer_history.avg, 1)
+
         if self.signal_history:
-            rates["signal_min"] = min(self.signal_history)
-            rates["signal_max"] = max(self.signal_history)
-            rates["signal_avg"] = round(sum(self.signal_history) / len(self.signal_history))
-        
+            rates["signal_min"] = self.signal_history.min
+            rates["signal_max"] = self.signal_history.max
+            rates["signal_avg"] = round(self.signal_history.avg)
+
         if self.rx_rate_history:
-            rates["rx_rate_min"] = round(min(self.rx_rate_history), 2)
-            rates["rx_rate_max"] = round(max(self.rx_rate_history), 2)
-            rates["rx_rate_avg"] = round(sum(self.rx_rate_history) / len(self.rx_rate_history), 2)
+            rates["rx_rate_min"] = round(self.rx_rate_history.min, 2)
+            rates["rx_rate_max"] = round(self.rx_rate_history.max, 2)
+            rates["rx_rate_avg"] = round(self.rx_rate_history.avg, 2)
         
         # === RISK ASSESSMENT ===
-        risk_level = "ok"
+        risk = RISK_OK
         risk_reasons = []
-        
+
         # Buffer checks
         if buffer_sec is not None:
             if buffer_sec < BUFFER_CRITICAL_SEC:
-                risk_level = "critical"
+                risk = RISK_CRITICAL
                 risk_reasons.append(f"Buffer critical: {buffer_sec:.1f}s")
                 self.buffer_critical_count += 1
             elif buffer_sec < BUFFER_DANGER_SEC:
-                if risk_level != "critical":
-                    risk_level = "danger"
+                risk = max(risk, RISK_DANGER)
                 risk_reasons.append(f"Buffer low: {buffer_sec:.1f}s")
                 self.buffer_danger_count += 1
         
         # Signal checks
         if signal_dbm is not None:
             if signal_dbm < SIGNAL_BAD_DBM:
-                if risk_level == "ok":
-                    risk_level = "danger"
+                risk = max(risk, RISK_DANGER)
                 risk_reasons.append(f"Weak signal: {signal_dbm} dBm")
             elif signal_dbm < SIGNAL_WEAK_DBM:
-                if risk_level == "ok":
-                    risk_level = "warning"
+                risk = max(risk, RISK_WARNING)
                 risk_reasons.append(f"Fair signal: {signal_dbm} dBm")
         
         # Bandwidth check
         rx_rate = rates.get("rx_rate_mbps", 0)
         if rx_rate > 0 and rx_rate < MIN_BITRATE_MBPS:
-            if risk_level == "ok":
-                risk_level = "warning"
+            risk = max(risk, RISK_WARNING)
             risk_reasons.append(f"Low bandwidth: {rx_rate:.1f} Mbps")
         
         # Buffering check (most severe)
         if mpv.get("buffering"):
-            risk_level = "critical"
+            risk = RISK_CRITICAL
             risk_reasons.append("Currently buffering!")
         
+        risk_level = RISK_LEVELS[risk]
         rates["risk_level"] = risk_level
         rates["risk_reasons"] = risk_reasons
         rates["buffer_danger_count"] = self.buffer_danger_count
         rates["buffer_critical_count"] = self.buffer_critical_count
         
         # Log pixelation risk events
-        if risk_level in ["danger", "critical"]:
+        if risk >= RISK_DANGER:
             event = {
                 "time": now,
                 "level": risk_level,
@@ -418,19 +739,19 @@ class RateCalculator:
                 "reasons": risk_reasons
             }
             self.pixelation_risk_events.append(event)
-            # Keep last 100 events
-            if len(self.pixelation_risk_events) > 100:
-                self.pixelation_risk_events = self.pixelation_risk_events[-100:]
-        
-        rates["recent_risk_events"] = len([e for e in self.pixelation_risk_events if now - e["time"] < 300])  # Last 5 min
-        
+
+        # Events in the last 5 min; newest are on the right, so stop at the first stale one
+        recent = 0
+        for e in reversed(self.pixelation_risk_events):
+            if now - e["time"] >= 300:
+                break
+            recent += 1
+        rates["recent_risk_events"] = recent
+
         return rates
 
 
-def signal_quality(dbm):
-    """Convert dBm to quality description"""
-    if dbm is None:
-        return "unknown"
+def _quality_name(dbm):
     if dbm >= -50:
         return "excellent"
     if dbm >= -60:
@@ -442,11 +763,44 @@ def signal_quality(dbm):
     return "poor"
 
 
+# Quality name for every whole dBm in the int8 range nl80211 reports (index = dBm + 128)
+_SIGNAL_QUALITY = tuple(_quality_name(dbm) for dbm in range(-128, 128))
+
+
+def signal_quality(dbm):
+    """Convert dBm to quality description"""
+    if dbm is None:
+        return "unknown"
+    # Thresholds are whole dBm, so flooring keeps fractional readings exact
+    return _SIGNAL_QUALITY[min(max(math.floor(dbm), -128), 127) + 128]
+
+
+def connect_collector(sock):
+    """Resolve the collector once and connect the UDP socket to it
+
+    A connected socket keeps the destination in the kernel, so each report
+    is a plain send() with no per-call address conversion or DNS lookup.
+    Returns False (retry next cycle) if the name doesn't resolve yet.
+    """
+    try:
+        addr = socket.getaddrinfo(COLLECTOR_HOST, COLLECTOR_PORT, socket.AF_INET, socket.SOCK_DGRAM)[0][4]
+        sock.connect(addr)
+    except OSError as e:
+        print(f"❌ Cannot reach collector {COLLECTOR_HOST}:{COLLECTOR_PORT}: {e}")
+        return False
+    return True
+
+
 def main():
     # Create UDP socket
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 18)  # Absorb short bursts without blocking
+    connected = connect_collector(sock)
     rate_calc = RateCalculator()
-    
+    # The collectors are independent and mostly wait on subprocesses/IO,
+    # so run them side by side and only wait for the slowest one
+    pool = ThreadPoolExecutor(max_workers=4)
+
     print("=" * 70)
     print("📊 YLEM PI - ENHANCED DIAGNOSTICS REPORTER v2")
     print("=" * 70)
@@ -461,72 +815,91 @@ def main():
     print(f"    Signal Bad:      < {SIGNAL_BAD_DBM} dBm")
     print("-" * 70)
     
-    while True:
-        try:
-            # Gather all stats
-            wifi = get_wifi_stats()
-            mpv = get_mpv_stats()
-            system = get_system_stats()
-            network = get_network_stats()
-            rates = rate_calc.calculate(network, wifi, mpv)
+    next_report = time.monotonic()
+    try:
+        while True:
+            try:
+                # Gather all stats
+                fw = pool.submit(get_wifi_stats)
+                fm = pool.submit(get_mpv_stats)
+                fs = pool.submit(get_system_stats)
+                fn = pool.submit(get_network_stats)
+                wifi, mpv, system, network = fw.result(), fm.result(), fs.result(), fn.result()
+                rates = rate_calc.calculate(network, wifi, mpv)
             
-            # Compile full report
-            report = {
-                "timestamp": time.time(),
-                "hostname": "YlemPi",
-                "wifi": wifi,
-                "mpv": mpv,
-                "system": system,
-                "network": network,
-                "rates": rates,
-            }
+                # Compile full report
+                report = {
+                    "timestamp": time.time(),
+                    "hostname": "YlemPi",
+                    "wifi": wifi,
+                    "mpv": mpv,
+                    "system": system,
+                    "network": network,
+                    "rates": rates,
+                }
             
-            # Send to collector
-            data = json.dumps(report).encode()
-            sock.sendto(data, (COLLECTOR_HOST, COLLECTOR_PORT))
+                # Send to collector
+                data = dumps(report)
+                if not connected:
+                    connected = connect_collector(sock)
+                if connected:
+                    try:
+                        sock.send(data)
+                    except ConnectionRefusedError:
+                        # ICMP port unreachable from an earlier report: collector is down
+                        pass
             
-            # === Local console summary ===
-            # Extract channel from path
-            channel = "N/A"
-            path = mpv.get("path")
-            if path:
-                match = re.search(r'/channel/(\d+)', path)
-                if match:
-                    channel = match.group(1)
+                # === Local console summary ===
+                # Extract channel from path
+                channel = "N/A"
+                path = mpv.get("path")
+                if path:
+                    match = _RE_CHANNEL.search(path)
+                    if match:
+                        channel = match.group(1)
             
-            # Build status line
-            sig = wifi.get("signal_dbm", "?")
-            qual = wifi.get("link_quality_pct", "?")
-            drops = mpv.get("dropped_frames", "?")
-            new_drops = rates.get("new_drops", 0)
-            cache = mpv.get("cache_duration_sec", "?")
-            rx_rate = rates.get("rx_rate_mbps", "?")
-            temp = system.get("cpu_temp_c", "?")
+                # Build status line
+                sig = wifi.get("signal_dbm", "?")
+                qual = wifi.get("link_quality_pct", "?")
+                drops = mpv.get("dropped_frames", "?")
+                new_drops = rates.get("new_drops", 0)
+                cache = mpv.get("cache_duration_sec", "?")
+                rx_rate = rates.get("rx_rate_mbps", "?")
+                temp = system.get("cpu_temp_c", "?")
             
-            # Risk indicator
-            risk = rates.get("risk_level", "ok")
-            risk_icon = {"ok": "✅", "warning": "⚠️ ", "danger": "🟠", "critical": "🔴"}.get(risk, "?")
+                # Risk indicator
+                risk = rates.get("risk_level", "ok")
+                risk_icon = _RISK_ICON.get(risk, "?")
             
-            drop_indicator = f"(+{new_drops})" if new_drops > 0 else ""
-            cache_str = f"{cache:.1f}" if isinstance(cache, float) else str(cache)
+                drop_indicator = f"(+{new_drops})" if new_drops > 0 else ""
+                cache_str = f"{cache:.1f}" if isinstance(cache, float) else str(cache)
             
-            # Color the output based on risk
-            print(f"{risk_icon} Ch:{channel:4} | "
-                  f"📶 {sig}dBm {qual}% | "
-                  f"📦 Buf:{cache_str}s | "
-                  f"⬇️ {rx_rate}Mbps | "
-                  f"🎬 Drop:{drops}{drop_indicator} | "
-                  f"🌡️ {temp}°C", end="")
+                # Color the output based on risk
+                print(f"{risk_icon} Ch:{channel:4} | "
+                      f"📶 {sig}dBm {qual}% | "
+                      f"📦 Buf:{cache_str}s | "
+                      f"⬇️ {rx_rate}Mbps | "
+                      f"🎬 Drop:{drops}{drop_indicator} | "
+                      f"🌡️ {temp}°C", end="")
             
-            if rates.get("risk_reasons"):
-                print(f" | ⚠️  {', '.join(rates['risk_reasons'])}")
-            else:
-                print()
+                if rates.get("risk_reasons"):
+                    print(f" | ⚠️  {', '.join(rates['risk_reasons'])}")
+                else:
+                    print()
             
-        except Exception as e:
-            print(f"❌ Error: {e}")
+            except Exception as e:
+                print(f"❌ Error: {e}")
         
-        time.sleep(REPORT_INTERVAL)
+            # Sleep to the next deadline so collection time doesn't add drift
+            next_report += REPORT_INTERVAL
+            delay = next_report - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind; start a fresh cadence instead of bursting
+                next_report = time.monotonic()
+    finally:
+        pool.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -7,12 +7,9 @@ echo   Building Ylem Installer
 echo ========================================
 echo.
 
-REM Check if pyinstaller is installed
-pip show pyinstaller >nul 2>&1
-if errorlevel 1 (
-    echo Installing PyInstaller...
-    pip install pyinstaller
-)
+REM Install PyInstaller and the optional modules the exe should bundle
+echo Checking build requirements...
+pip install -q -r "%~dp0requirements-build.txt"
 
 echo.
 echo Building exe...
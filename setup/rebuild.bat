@@ -42,6 +42,7 @@ git push
 echo.
 echo Building YlemSetup.exe...
 cd setup
+python -m pip install -q -r requirements-build.txt
 python -m PyInstaller --onefile --windowed --name "YlemSetup" ylem_installer.py
 
 echo.
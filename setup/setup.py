@@ -11,9 +11,200 @@ import subprocess
 import os
 import re
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+ENV_HEADER = """# ===========================================
+# YLEM CONFIGURATION
+# Generated by Ylem Setup Wizard
+# ==========================================="""
+
+# Generated file templates, filled with str.format_map(config)
+NGINX_TEMPLATE = """# ===========================================
+# YLEM - Nginx Proxy Manager Advanced Config
+# Generated by Setup Wizard
+# Paste this into NPM → Hosts → Edit → Advanced
+# ===========================================
+
+# Serve index.html for root
+location = / {{
+    root /data;
+    try_files /index.html =404;
+}}
+
+# Serve watch.html for /chXXXX URLs
+location ~ ^/ch\\d+$ {{
+    root /data;
+    try_files /watch.html =404;
+}}
+
+# V2 Game Hub files
+location /v2/ {{
+    root /data;
+    try_files $uri $uri/ =404;
+}}
+
+# Games hub (clean URL)
+location = /games {{
+    root /data;
+    try_files /v2/games.html =404;
+}}
+
+# EPG Guide (clean URL)
+location = /guide {{
+    root /data;
+    try_files /v2/guide.html =404;
+}}
+
+# IPTV proxy (ErsatzTV streams)
+location /iptv/ {{
+    proxy_pass http://{host_ip}:{ersatztv_port}/iptv/;
+    proxy_http_version 1.1;
+    proxy_set_header Host $host;
+    proxy_set_header Connection "";
+    proxy_buffering off;
+}}
+
+# WebSocket proxy for multiplayer
+location /ws/ {{
+    proxy_pass http://{host_ip}:{game_server_port}/;
+    proxy_http_version 1.1;
+    proxy_set_header Upgrade $http_upgrade;
+    proxy_set_header Connection "upgrade";
+    proxy_set_header Host $host;
+    proxy_set_header X-Real-IP $remote_addr;
+    proxy_read_timeout 86400;
+}}
+
+# EPG API proxy
+location ^~ /api/epg {{
+    proxy_pass http://{host_ip}:{epg_server_port};
+    proxy_http_version 1.1;
+    proxy_set_header Host $host;
+    proxy_set_header X-Real-IP $remote_addr;
+}}
+
+# Serve static files
+location ~ \\.(html|css|js|ico|png|jpg|svg|txt|json)$ {{
+    root /data;
+    try_files $uri =404;
+}}
+"""
+
+STREAM_STARTUP_TEMPLATE = """#!/bin/bash
+# Ylem CRT TV Stream Startup
+# Generated by Setup Wizard
+
+HOST_IP="{host_ip}"
+DEFAULT_CHANNEL="{pi_default_channel}"
+
+# Wait for network
+sleep 5
+
+# Start MPV with the default channel
+mpv --no-terminal --fullscreen \\
+    --vo=gpu --hwdec=auto \\
+    "http://$HOST_IP:{ersatztv_port}/iptv/channel/$DEFAULT_CHANNEL.m3u8"
+"""
+
+# Characters docker compose takes literally in an unquoted .env value
+_ENV_PLAIN_RE = re.compile(r'[\w@%+=:,./-]*')
+
+# "1000:Channel One,1001:Channel Two" - comma-separated number:name pairs
+_CHANNEL_RE = re.compile(r'\d+:[^,]+(?:,\s*\d+:[^,]+)*')
+
+
+def env_value(value):
+    """Quote a value for a docker compose .env file"""
+    value = str(value)
+    if _ENV_PLAIN_RE.fullmatch(value):
+        return value
+    if "'" not in value and '\n' not in value:
+        return f"'{value}'"  # Single quotes: taken verbatim
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"')
+               .replace('$', '$$').replace('\n', '\\n'))
+    return f'"{escaped}"'
+
+
+# O_BINARY keeps Windows from turning \n into \r\n (bash chokes on CRLF scripts)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+
+def write_file(path, text):
+    """Write a generated file with one open and (usually) one write syscall"""
+    data = text.encode('utf-8')
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst (no data copied), falling back to a real copy"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Filesystem without hard links (FAT/exFAT, some network shares)
+        shutil.copy2(src, dst)
+    return dst
+
+
+# FAT/exFAT store mtimes at 2 s resolution, so allow that much drift
+_MTIME_SLACK = 2
+
+
+def sync_tree(src, dst, copy_function=shutil.copy2):
+    """Copy only the files under src that are missing from dst or differ in (size, mtime)"""
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(dst) as entries:
+        existing = {entry.name: entry for entry in entries}
+    
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                sync_tree(entry.path, target, copy_function)
+                continue
+            
+            old = existing.get(entry.name)
+            if old is not None:
+                new_st, old_st = entry.stat(), old.stat()
+                if (new_st.st_size == old_st.st_size
+                        and abs(new_st.st_mtime - old_st.st_mtime) < _MTIME_SLACK):
+                    continue
+                os.unlink(target)  # os.link needs the target gone
+            copy_function(entry.path, target)
+
+
 class YlemSetupWizard:
+    # (config key, label, default, description) for each port on the ports page
+    _PORT_SPECS = (
+        ('npm_http_port', 'HTTP Port', '80', 'Main web traffic'),
+        ('npm_https_port', 'HTTPS Port', '443', 'Secure web traffic'),
+        ('npm_admin_port', 'NPM Admin Port', '81', 'Nginx Proxy Manager admin'),
+        ('game_server_port', 'Game Server Port', '3000', 'WebSocket for multiplayer'),
+        ('epg_server_port', 'EPG Server Port', '3001', 'TV guide data API'),
+    )
+    
+    # Label + entry + description rows per page: (config key, label, entry width, description)
+    FORM_SCHEMA = {
+        'ports': tuple((key, label, 8, desc) for key, label, _, desc in _PORT_SPECS),
+        'pi': (
+            ('pi_hostname', 'Pi Hostname', 20, ''),
+            ('pi_user', 'Pi Username', 20, ''),
+            ('pi_default_channel', 'Default Channel', 10, 'Channel to play on Pi startup'),
+        ),
+    }
+    
+    # Independent file steps run by _deploy_worker, one progress tick each
+    _DEPLOY_STEPS = 4
+    
+    # Source directories copied into the install folder
+    _SOURCE_DIRS = ('data', 'web', 'epg-server', 'game-server', 'diagnostics', 'scripts')
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Ylem Setup Wizard")
@@ -45,7 +236,14 @@ class YlemSetupWizard:
         
         # Track current page
         self.current_page = 0
+        self.vars = {}  # Tk variable per config key, registered as pages are built
+        self._summary_dirty = True  # Set by variable traces, cleared by refresh_summary
         self.pages = []
+        self.page_frames = []   # Built lazily, then reused on every visit
+        self.shown_frame = None
+        self._detected_ip = None  # Auto-detected once per wizard session
+        self._deploy_dirs = None  # (install, templates, pi-client) Paths, created once
+        self._resolved_install_path = None  # Absolute install dir, set once deployed
         
         # Create main container
         self.container = ttk.Frame(root, padding="10")
@@ -68,6 +266,9 @@ class YlemSetupWizard:
         # Build all pages
         self.build_pages()
         self.show_page(0)
+        
+        # Build the next page once the window is up so Next is instant
+        self.root.after(50, self._prebuild, 1)
     
     def build_pages(self):
         """Build all wizard pages"""
@@ -82,13 +283,23 @@ class YlemSetupWizard:
             self.create_summary_page,
             self.create_complete_page,
         ]
+        self.page_frames = [None] * len(self.pages)
+    
+    def _prebuild(self, index):
+        """Construct a page without showing it, if it isn't built yet"""
+        if self.page_frames[index] is None:
+            registered = len(self.vars)
+            self.page_frames[index] = self.pages[index]()
+            # Any edit to this page's fields makes the summary stale
+            for var in list(self.vars.values())[registered:]:
+                var.trace_add('write', self._mark_summary_dirty)
+    
+    def _mark_summary_dirty(self, *args):
+        """Variable trace: the summary text no longer matches the pages"""
+        self._summary_dirty = True
     
     def show_page(self, index):
         """Display a specific page"""
-        # Clear current page
-        for widget in self.page_frame.winfo_children():
-            widget.destroy()
-        
         # Update navigation buttons
         self.back_btn.config(state=tk.NORMAL if index > 0 else tk.DISABLED)
         
@@ -100,9 +311,20 @@ class YlemSetupWizard:
         else:
             self.next_btn.config(text="Next →")
         
-        # Show the page
+        # Show the page, building it on the first visit only
+        frame = self.page_frames[index]
+        if frame is None:
+            self._prebuild(index)
+            frame = self.page_frames[index]
+        elif index == len(self.pages) - 2:
+            # The summary mirrors the other pages, so refresh it on every visit
+            self.refresh_summary()
+        
+        if self.shown_frame is not None:
+            self.shown_frame.pack_forget()
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.shown_frame = frame
         self.current_page = index
-        self.pages[index]()
     
     def next_page(self):
         """Go to next page"""
@@ -121,7 +343,6 @@ class YlemSetupWizard:
     # ─────────────────────────────────────────────────────────────────
     def create_welcome_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🎬 Welcome to Ylem Setup", 
                   font=('Helvetica', 18, 'bold')).pack(pady=(0, 20))
@@ -149,14 +370,30 @@ optionally start the Docker containers for you."""
         path_frame = ttk.LabelFrame(frame, text="Installation Path", padding="10")
         path_frame.pack(fill=tk.X, pady=20)
         
-        self.install_path_var = tk.StringVar(value=self.config['install_path'])
-        ttk.Entry(path_frame, textvariable=self.install_path_var, width=50).pack(side=tk.LEFT, padx=(0, 10))
+        self.vars['install_path'] = tk.StringVar(value=self.config['install_path'])
+        ttk.Entry(path_frame, textvariable=self.vars['install_path'], width=50).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(path_frame, text="Browse...", command=self.browse_install_path).pack(side=tk.LEFT)
+        
+        return frame
+    
+    def ask_directory(self, title, initial=''):
+        """Show the folder picker without the wizard looking frozen behind it"""
+        # Paint pending changes first and lock Back/Next while the dialog is up
+        self.root.update_idletasks()
+        buttons = [(btn, str(btn.cget('state'))) for btn in (self.back_btn, self.next_btn)]
+        for btn, _ in buttons:
+            btn.config(state=tk.DISABLED)
+        try:
+            return filedialog.askdirectory(parent=self.root, title=title,
+                                           initialdir=initial or None)
+        finally:
+            for btn, state in buttons:
+                btn.config(state=state)
     
     def browse_install_path(self):
-        path = filedialog.askdirectory(title="Select Installation Folder")
+        path = self.ask_directory("Select Installation Folder", self.vars['install_path'].get())
         if path:
-            self.install_path_var.set(path)
+            self.vars['install_path'].set(path)
             self.config['install_path'] = path
     
     # ─────────────────────────────────────────────────────────────────
@@ -164,7 +401,6 @@ optionally start the Docker containers for you."""
     # ─────────────────────────────────────────────────────────────────
     def create_network_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🌐 Network Configuration", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
@@ -173,8 +409,8 @@ optionally start the Docker containers for you."""
         ip_frame = ttk.LabelFrame(frame, text="Local IP Address", padding="10")
         ip_frame.pack(fill=tk.X, pady=10)
         
-        self.host_ip_var = tk.StringVar(value=self.config['host_ip'])
-        ip_entry = ttk.Entry(ip_frame, textvariable=self.host_ip_var, width=20)
+        self.vars['host_ip'] = tk.StringVar(value=self.config['host_ip'])
+        ip_entry = ttk.Entry(ip_frame, textvariable=self.vars['host_ip'], width=20)
         ip_entry.pack(side=tk.LEFT, padx=(0, 10))
         
         ttk.Button(ip_frame, text="🔍 Auto-Detect", command=self.detect_ip).pack(side=tk.LEFT)
@@ -188,8 +424,8 @@ optionally start the Docker containers for you."""
         etv_frame = ttk.LabelFrame(frame, text="ErsatzTV Port", padding="10")
         etv_frame.pack(fill=tk.X, pady=10)
         
-        self.ersatztv_port_var = tk.StringVar(value=self.config['ersatztv_port'])
-        ttk.Entry(etv_frame, textvariable=self.ersatztv_port_var, width=10).pack(side=tk.LEFT)
+        self.vars['ersatztv_port'] = tk.StringVar(value=self.config['ersatztv_port'])
+        ttk.Entry(etv_frame, textvariable=self.vars['ersatztv_port'], width=10).pack(side=tk.LEFT)
         
         ttk.Label(etv_frame, text="  Default is 8409. Only change if you modified ErsatzTV settings.",
                   foreground='gray').pack(side=tk.LEFT)
@@ -197,18 +433,36 @@ optionally start the Docker containers for you."""
         # Auto-detect IP on page load
         if not self.config['host_ip']:
             self.detect_ip()
+        
+        return frame
     
     def detect_ip(self):
-        """Auto-detect the local IP address"""
+        """Auto-detect the local IP address without blocking the UI"""
+        if self._detected_ip:
+            self._apply_detected_ip(self._detected_ip)
+            return
+        
+        threading.Thread(target=self._detect_ip_worker, daemon=True).start()
+    
+    def _detect_ip_worker(self):
+        """Find the local IP off the Tk thread and hand it back via after()"""
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
             ip = s.getsockname()[0]
             s.close()
-            self.host_ip_var.set(ip)
-            self.config['host_ip'] = ip
         except Exception:
-            self.host_ip_var.set("192.168.1.100")
+            ip = None
+        self.root.after(0, self._apply_detected_ip, ip)
+    
+    def _apply_detected_ip(self, ip):
+        """Fill in the detected IP (runs on the Tk thread)"""
+        if ip:
+            self._detected_ip = ip
+            self.vars['host_ip'].set(ip)
+            self.config['host_ip'] = ip
+        else:
+            self.vars['host_ip'].set("192.168.1.100")
             messagebox.showwarning("Auto-Detect Failed", 
                 "Could not auto-detect IP. Please enter it manually.")
     
@@ -217,7 +471,6 @@ optionally start the Docker containers for you."""
     # ─────────────────────────────────────────────────────────────────
     def create_ports_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🔌 Port Configuration", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
@@ -226,29 +479,12 @@ optionally start the Docker containers for you."""
                   "Default ports are recommended unless you have conflicts.",
                   foreground='gray').pack(anchor='w', pady=(0, 20))
         
-        # Port entries
+        # Port entries: one grid instead of a frame per row
         ports_frame = ttk.Frame(frame)
         ports_frame.pack(fill=tk.X)
         
-        self.port_vars = {}
-        ports = [
-            ('npm_http_port', 'HTTP Port', '80', 'Main web traffic'),
-            ('npm_https_port', 'HTTPS Port', '443', 'Secure web traffic'),
-            ('npm_admin_port', 'NPM Admin Port', '81', 'Nginx Proxy Manager admin'),
-            ('game_server_port', 'Game Server Port', '3000', 'WebSocket for multiplayer'),
-            ('epg_server_port', 'EPG Server Port', '3001', 'TV guide data API'),
-        ]
-        
-        for i, (key, label, default, desc) in enumerate(ports):
-            row = ttk.Frame(ports_frame)
-            row.pack(fill=tk.X, pady=5)
-            
-            ttk.Label(row, text=f"{label}:", width=18, anchor='e').pack(side=tk.LEFT)
-            
-            self.port_vars[key] = tk.StringVar(value=self.config.get(key, default))
-            ttk.Entry(row, textvariable=self.port_vars[key], width=8).pack(side=tk.LEFT, padx=10)
-            
-            ttk.Label(row, text=desc, foreground='gray').pack(side=tk.LEFT)
+        for row, spec in enumerate(self.FORM_SCHEMA['ports']):
+            self._build_row(ports_frame, row, *spec, label_width=18)
         
         # Test mode info
         test_frame = ttk.LabelFrame(frame, text="💡 Testing Tip", padding="10")
@@ -257,13 +493,14 @@ optionally start the Docker containers for you."""
         ttk.Label(test_frame, text="For side-by-side testing with existing installation:\n"
                   "Use ports like 9080, 9443, 9081, 3100, 3101 to avoid conflicts.",
                   foreground='gray').pack(anchor='w')
+        
+        return frame
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 4: Domain & DuckDNS
     # ─────────────────────────────────────────────────────────────────
     def create_domain_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🌍 Domain & Dynamic DNS", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
@@ -272,8 +509,8 @@ optionally start the Docker containers for you."""
         domain_frame = ttk.LabelFrame(frame, text="Domain Name (Optional)", padding="10")
         domain_frame.pack(fill=tk.X, pady=10)
         
-        self.domain_var = tk.StringVar(value=self.config['domain'])
-        ttk.Entry(domain_frame, textvariable=self.domain_var, width=30).pack(side=tk.LEFT)
+        self.vars['domain'] = tk.StringVar(value=self.config['domain'])
+        ttk.Entry(domain_frame, textvariable=self.vars['domain'], width=30).pack(side=tk.LEFT)
         
         ttk.Label(domain_frame, text="  Leave blank for local-only access",
                   foreground='gray').pack(side=tk.LEFT)
@@ -282,9 +519,9 @@ optionally start the Docker containers for you."""
         duck_frame = ttk.LabelFrame(frame, text="Dynamic DNS (DuckDNS)", padding="10")
         duck_frame.pack(fill=tk.X, pady=10)
         
-        self.duckdns_enabled_var = tk.BooleanVar(value=self.config['duckdns_enabled'])
+        self.vars['duckdns_enabled'] = tk.BooleanVar(value=self.config['duckdns_enabled'])
         ttk.Checkbutton(duck_frame, text="Enable DuckDNS", 
-                        variable=self.duckdns_enabled_var).pack(anchor='w')
+                        variable=self.vars['duckdns_enabled']).pack(anchor='w')
         
         ttk.Label(duck_frame, text="\nDuckDNS automatically updates your domain when your\n"
                   "public IP changes. Free service at duckdns.org",
@@ -294,23 +531,24 @@ optionally start the Docker containers for you."""
         sub_frame.pack(fill=tk.X, pady=(10, 0))
         
         ttk.Label(sub_frame, text="Subdomain:").pack(side=tk.LEFT)
-        self.duckdns_subdomain_var = tk.StringVar(value=self.config['duckdns_subdomain'])
-        ttk.Entry(sub_frame, textvariable=self.duckdns_subdomain_var, width=20).pack(side=tk.LEFT, padx=5)
+        self.vars['duckdns_subdomain'] = tk.StringVar(value=self.config['duckdns_subdomain'])
+        ttk.Entry(sub_frame, textvariable=self.vars['duckdns_subdomain'], width=20).pack(side=tk.LEFT, padx=5)
         ttk.Label(sub_frame, text=".duckdns.org").pack(side=tk.LEFT)
         
         token_frame = ttk.Frame(duck_frame)
         token_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(token_frame, text="Token:").pack(side=tk.LEFT)
-        self.duckdns_token_var = tk.StringVar(value=self.config['duckdns_token'])
-        ttk.Entry(token_frame, textvariable=self.duckdns_token_var, width=40, show='*').pack(side=tk.LEFT, padx=5)
+        self.vars['duckdns_token'] = tk.StringVar(value=self.config['duckdns_token'])
+        ttk.Entry(token_frame, textvariable=self.vars['duckdns_token'], width=40, show='*').pack(side=tk.LEFT, padx=5)
+        
+        return frame
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 5: Channels
     # ─────────────────────────────────────────────────────────────────
     def create_channels_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="📺 Channel Configuration", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
@@ -323,8 +561,8 @@ optionally start the Docker containers for you."""
         web_frame = ttk.LabelFrame(frame, text="Web Channels", padding="10")
         web_frame.pack(fill=tk.X, pady=10)
         
-        self.web_channels_var = tk.StringVar(value=self.config['web_channels'])
-        ttk.Entry(web_frame, textvariable=self.web_channels_var, width=70).pack(fill=tk.X)
+        self.vars['web_channels'] = tk.StringVar(value=self.config['web_channels'])
+        ttk.Entry(web_frame, textvariable=self.vars['web_channels'], width=70).pack(fill=tk.X)
         
         ttk.Label(web_frame, text="Channels displayed on your website",
                   foreground='gray').pack(anchor='w')
@@ -333,18 +571,19 @@ optionally start the Docker containers for you."""
         pi_frame = ttk.LabelFrame(frame, text="Pi Channels (CRT TV)", padding="10")
         pi_frame.pack(fill=tk.X, pady=10)
         
-        self.pi_channels_var = tk.StringVar(value=self.config['pi_channels'])
-        ttk.Entry(pi_frame, textvariable=self.pi_channels_var, width=70).pack(fill=tk.X)
+        self.vars['pi_channels'] = tk.StringVar(value=self.config['pi_channels'])
+        ttk.Entry(pi_frame, textvariable=self.vars['pi_channels'], width=70).pack(fill=tk.X)
         
         ttk.Label(pi_frame, text="4:3 channels for Raspberry Pi CRT setup",
                   foreground='gray').pack(anchor='w')
+        
+        return frame
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 6: Raspberry Pi
     # ─────────────────────────────────────────────────────────────────
     def create_pi_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🥧 Raspberry Pi Configuration", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
@@ -356,42 +595,34 @@ optionally start the Docker containers for you."""
         config_frame = ttk.Frame(frame)
         config_frame.pack(fill=tk.X)
         
-        # Hostname
-        row1 = ttk.Frame(config_frame)
-        row1.pack(fill=tk.X, pady=5)
-        ttk.Label(row1, text="Pi Hostname:", width=15, anchor='e').pack(side=tk.LEFT)
-        self.pi_hostname_var = tk.StringVar(value=self.config['pi_hostname'])
-        ttk.Entry(row1, textvariable=self.pi_hostname_var, width=20).pack(side=tk.LEFT, padx=10)
-        
-        # Username
-        row2 = ttk.Frame(config_frame)
-        row2.pack(fill=tk.X, pady=5)
-        ttk.Label(row2, text="Pi Username:", width=15, anchor='e').pack(side=tk.LEFT)
-        self.pi_user_var = tk.StringVar(value=self.config['pi_user'])
-        ttk.Entry(row2, textvariable=self.pi_user_var, width=20).pack(side=tk.LEFT, padx=10)
-        
-        # Default Channel
-        row3 = ttk.Frame(config_frame)
-        row3.pack(fill=tk.X, pady=5)
-        ttk.Label(row3, text="Default Channel:", width=15, anchor='e').pack(side=tk.LEFT)
-        self.pi_default_channel_var = tk.StringVar(value=self.config['pi_default_channel'])
-        ttk.Entry(row3, textvariable=self.pi_default_channel_var, width=10).pack(side=tk.LEFT, padx=10)
-        ttk.Label(row3, text="Channel to play on Pi startup", foreground='gray').pack(side=tk.LEFT)
+        for row, spec in enumerate(self.FORM_SCHEMA['pi']):
+            self._build_row(config_frame, row, *spec, label_width=15)
+        
+        return frame
+    
+    def _build_row(self, parent, row, key, label, width, desc, label_width):
+        """Grid one label + entry (+ description) row and register its variable"""
+        ttk.Label(parent, text=f"{label}:", width=label_width, anchor='e').grid(row=row, column=0, pady=5)
+        
+        self.vars[key] = tk.StringVar(value=self.config[key])
+        ttk.Entry(parent, textvariable=self.vars[key], width=width).grid(row=row, column=1, padx=10, sticky='w')
+        
+        if desc:
+            ttk.Label(parent, text=desc, foreground='gray').grid(row=row, column=2, sticky='w')
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 7: Backup
     # ─────────────────────────────────────────────────────────────────
     def create_backup_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="💾 Backup Configuration", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
         
         # Enable backups
-        self.backup_enabled_var = tk.BooleanVar(value=self.config['backup_enabled'])
+        self.vars['backup_enabled'] = tk.BooleanVar(value=self.config['backup_enabled'])
         ttk.Checkbutton(frame, text="Enable automatic daily backups", 
-                        variable=self.backup_enabled_var).pack(anchor='w')
+                        variable=self.vars['backup_enabled']).pack(anchor='w')
         
         ttk.Label(frame, text="\nBackups player data (items.json, leaderboard.json)\n"
                   "daily at 3:00 AM. Keeps last 30 days.",
@@ -402,8 +633,8 @@ optionally start the Docker containers for you."""
         path_frame.pack(fill=tk.X, pady=10)
         
         default_backup = os.path.join(self.config['install_path'], 'backups')
-        self.backup_path_var = tk.StringVar(value=self.config['backup_path'] or default_backup)
-        ttk.Entry(path_frame, textvariable=self.backup_path_var, width=50).pack(side=tk.LEFT, padx=(0, 10))
+        self.vars['backup_path'] = tk.StringVar(value=self.config['backup_path'] or default_backup)
+        ttk.Entry(path_frame, textvariable=self.vars['backup_path'], width=50).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(path_frame, text="Browse...", command=self.browse_backup_path).pack(side=tk.LEFT)
         
         # What gets backed up
@@ -415,24 +646,43 @@ optionally start the Docker containers for you."""
                   "Note: ErsatzTV database should be backed up separately\n"
                   "from %AppData%\\ersatztv\\",
                   justify=tk.LEFT).pack(anchor='w')
+        
+        return frame
     
     def browse_backup_path(self):
-        path = filedialog.askdirectory(title="Select Backup Folder")
+        path = self.ask_directory("Select Backup Folder", self.vars['backup_path'].get())
         if path:
-            self.backup_path_var.set(path)
+            self.vars['backup_path'].set(path)
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 8: Summary
     # ─────────────────────────────────────────────────────────────────
     def create_summary_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="📋 Configuration Summary", 
                   font=('Helvetica', 16, 'bold')).pack(pady=(0, 20))
         
-        # Collect all values
-        self.collect_config()
+        self.summary_text = tk.Text(frame, height=18, width=60, font=('Consolas', 10))
+        self.summary_text.pack(pady=10)
+        self.refresh_summary()
+        
+        ttk.Label(frame, text="Click 'Deploy' to generate configuration files and start services.",
+                  foreground='gray').pack()
+        
+        return frame
+    
+    def refresh_summary(self):
+        """Rewrite the summary text from the current page values"""
+        # Nothing changed since the last visit, so the shown text is still current
+        if not self._summary_dirty:
+            return
+        
+        # Collect all values; a bad channel list is reported but still summarized
+        try:
+            self.collect_config()
+        except ValueError as e:
+            messagebox.showwarning("Invalid Channels", str(e))
         
         # Create summary text
         summary = f"""Network:
@@ -456,44 +706,32 @@ Backups:
 
 Install Path: {self.config['install_path']}"""
         
-        text_widget = tk.Text(frame, height=18, width=60, font=('Consolas', 10))
-        text_widget.insert('1.0', summary)
-        text_widget.config(state=tk.DISABLED)
-        text_widget.pack(pady=10)
-        
-        ttk.Label(frame, text="Click 'Deploy' to generate configuration files and start services.",
-                  foreground='gray').pack()
+        self.summary_text.config(state=tk.NORMAL)
+        self.summary_text.delete('1.0', tk.END)
+        self.summary_text.insert('1.0', summary)
+        self.summary_text.config(state=tk.DISABLED)
+        self._summary_dirty = False
     
     def collect_config(self):
         """Collect all config values from UI"""
-        try:
-            self.config['install_path'] = self.install_path_var.get()
-            self.config['host_ip'] = self.host_ip_var.get()
-            self.config['ersatztv_port'] = self.ersatztv_port_var.get()
-            
-            for key, var in self.port_vars.items():
-                self.config[key] = var.get()
-            
-            self.config['domain'] = self.domain_var.get()
-            self.config['duckdns_enabled'] = self.duckdns_enabled_var.get()
-            self.config['duckdns_subdomain'] = self.duckdns_subdomain_var.get()
-            self.config['duckdns_token'] = self.duckdns_token_var.get()
-            self.config['web_channels'] = self.web_channels_var.get()
-            self.config['pi_channels'] = self.pi_channels_var.get()
-            self.config['pi_hostname'] = self.pi_hostname_var.get()
-            self.config['pi_user'] = self.pi_user_var.get()
-            self.config['pi_default_channel'] = self.pi_default_channel_var.get()
-            self.config['backup_enabled'] = self.backup_enabled_var.get()
-            self.config['backup_path'] = self.backup_path_var.get()
-        except:
-            pass  # Some vars may not exist yet
+        # Every input page must exist so all of its variables are registered
+        for index in range(len(self.pages) - 2):
+            self._prebuild(index)
+        
+        self.config.update({key: var.get() for key, var in self.vars.items()})
+        
+        # Channel lists go verbatim into .env, so reject malformed ones here
+        for key, name in (('web_channels', 'Web'), ('pi_channels', 'Pi')):
+            value = self.config[key].strip()
+            if value and not _CHANNEL_RE.fullmatch(value):
+                raise ValueError(f"{name} channels must look like "
+                                 f"'1000:Channel One,1001:Channel Two', got: {value}")
     
     # ─────────────────────────────────────────────────────────────────
     # PAGE 9: Complete
     # ─────────────────────────────────────────────────────────────────
     def create_complete_page(self):
         frame = ttk.Frame(self.page_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(frame, text="🎉 Setup Complete!", 
                   font=('Helvetica', 18, 'bold')).pack(pady=(0, 20))
@@ -528,197 +766,193 @@ The generated .env file is at:
         btn_frame.pack(pady=10)
         
         ttk.Button(btn_frame, text="📂 Open Install Folder", 
-                   command=lambda: os.startfile(self.config['install_path'])).pack(side=tk.LEFT, padx=5)
+                   command=lambda p=self._resolved_install_path: os.startfile(p)).pack(side=tk.LEFT, padx=5)
+        
+        return frame
     
     # ─────────────────────────────────────────────────────────────────
     # DEPLOYMENT
     # ─────────────────────────────────────────────────────────────────
     def deploy(self):
         """Generate all configuration files"""
-        self.collect_config()
-        
         try:
-            install_path = Path(self.config['install_path'])
-            install_path.mkdir(parents=True, exist_ok=True)
-            
-            # Generate .env file
-            self.generate_env_file(install_path)
-            
-            # Generate nginx config
-            self.generate_nginx_config(install_path)
-            
-            # Generate Pi files
-            self.generate_pi_files(install_path)
-            
-            # Copy source files if they exist in same directory
-            self.copy_source_files(install_path)
-            
-            messagebox.showinfo("Success", "Configuration files generated successfully!")
-            self.show_page(self.current_page + 1)
+            self.collect_config()
+        except ValueError as e:
+            messagebox.showerror("Invalid Channels", str(e))
+            return
+        
+        # Lock navigation and show progress while the worker runs
+        self.back_btn.config(state=tk.DISABLED)
+        self.next_btn.config(text="Deploying...", state=tk.DISABLED)
+        self.deploy_progress = ttk.Progressbar(self.nav_frame, mode='determinate', length=200,
+                                               maximum=self._DEPLOY_STEPS)
+        self.deploy_progress.pack(side=tk.RIGHT, padx=10)
+        
+        self._deploy_remaining = self._DEPLOY_STEPS
+        self._deploy_error = None
+        
+        # The worker writes one byte per finished step and Tk's own event loop
+        # wakes on it. Windows Tk has no file handlers, so there it uses after()
+        self._deploy_pipe = None
+        if hasattr(self.root.tk, 'createfilehandler'):
+            self._deploy_pipe = os.pipe()
+            self.root.tk.createfilehandler(self._deploy_pipe[0], tk.READABLE, self._deploy_readable)
+        
+        thread = threading.Thread(target=self._deploy_worker)
+        thread.start()
+    
+    def _deploy_worker(self):
+        """Write all files off the Tk thread, signalling each finished step"""
+        finished = 0
+        try:
+            install_path, templates_dir, pi_dir = self.deploy_dirs()
             
+            # .env, nginx config, Pi files and the source copy are independent
+            steps = (
+                (self.generate_env_file, install_path),
+                (self.generate_nginx_config, templates_dir),
+                (self.generate_pi_files, pi_dir),
+                (self.copy_source_files, install_path),
+            )
+            with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+                for done in as_completed([pool.submit(step, path) for step, path in steps]):
+                    finished += 1
+                    error = done.exception()
+                    if error is not None and self._deploy_error is None:
+                        self._deploy_error = error  # Report the first failure
+                    self._signal_steps(1)
         except Exception as e:
-            messagebox.showerror("Error", f"Deployment failed:\n{str(e)}")
+            self._deploy_error = e
+            self._signal_steps(self._DEPLOY_STEPS - finished)
+    
+    def _signal_steps(self, count):
+        """Tell the Tk thread that count deploy steps have finished"""
+        if self._deploy_pipe is not None:
+            os.write(self._deploy_pipe[1], b'.' * count)
+        else:
+            self.root.after(0, self._deploy_steps_done, count)
+    
+    def _deploy_readable(self, fd, mask):
+        """Tk file handler: each byte on the pipe is one finished step"""
+        self._deploy_steps_done(len(os.read(fd, self._DEPLOY_STEPS)))
+    
+    def _deploy_steps_done(self, count):
+        """Advance the progress bar and finish once every step has reported"""
+        self._deploy_remaining -= count
+        self.deploy_progress.step(count)
+        if self._deploy_remaining <= 0:
+            self._deploy_done(self._deploy_error)
+    
+    def deploy_dirs(self):
+        """Return (install, templates, pi-client) dirs, creating them once per path"""
+        install_path = Path(self.config['install_path'])
+        if self._deploy_dirs is None or self._deploy_dirs[0] != install_path:
+            dirs = (install_path, install_path / 'setup' / 'templates', install_path / 'pi-client')
+            for d in dirs:
+                d.mkdir(parents=True, exist_ok=True)
+            self._deploy_dirs = dirs
+            self._resolved_install_path = str(install_path.resolve())
+        return self._deploy_dirs
+    
+    def _deploy_done(self, error):
+        """Finish a deploy on the Tk thread"""
+        if self._deploy_pipe is not None:
+            self.root.tk.deletefilehandler(self._deploy_pipe[0])
+            for fd in self._deploy_pipe:
+                os.close(fd)
+            self._deploy_pipe = None
+        
+        self.deploy_progress.destroy()
+        
+        if error is not None:
+            self.back_btn.config(state=tk.NORMAL)
+            self.next_btn.config(text="🚀 Deploy", state=tk.NORMAL)
+            messagebox.showerror("Error", f"Deployment failed:\n{str(error)}")
+            return
+        
+        self.next_btn.config(state=tk.NORMAL)
+        messagebox.showinfo("Success", "Configuration files generated successfully!")
+        self.show_page(self.current_page + 1)
     
     def generate_env_file(self, install_path):
         """Generate the .env file"""
-        env_content = f"""# ===========================================
-# YLEM CONFIGURATION
-# Generated by Ylem Setup Wizard
-# ===========================================
-
-# Network
-HOST_IP={self.config['host_ip']}
-DOMAIN={self.config['domain']}
-
-# Ports
-NPM_HTTP_PORT={self.config['npm_http_port']}
-NPM_HTTPS_PORT={self.config['npm_https_port']}
-NPM_ADMIN_PORT={self.config['npm_admin_port']}
-GAME_SERVER_PORT={self.config['game_server_port']}
-EPG_SERVER_PORT={self.config['epg_server_port']}
-ERSATZTV_PORT={self.config['ersatztv_port']}
-
-# Dynamic DNS
-DUCKDNS_ENABLED={str(self.config['duckdns_enabled']).lower()}
-DUCKDNS_SUBDOMAIN={self.config['duckdns_subdomain']}
-DUCKDNS_TOKEN={self.config['duckdns_token']}
-
-# Channels
-WEB_CHANNELS={self.config['web_channels']}
-PI_CHANNELS={self.config['pi_channels']}
-
-# Raspberry Pi
-PI_HOSTNAME={self.config['pi_hostname']}
-PI_USER={self.config['pi_user']}
-PI_DEFAULT_CHANNEL={self.config['pi_default_channel']}
-
-# Backups
-BACKUP_ENABLED={str(self.config['backup_enabled']).lower()}
-BACKUP_PATH={self.config['backup_path']}
-BACKUP_TIME=03:00
-BACKUP_RETENTION_DAYS=30
-
-# Version Pinning
-NPM_IMAGE_VERSION=latest
-NODE_IMAGE_VERSION=20-alpine
-"""
-        env_path = install_path / '.env'
-        env_path.write_text(env_content)
+        c = self.config
+        sections = (
+            ('Network', (
+                ('HOST_IP', c['host_ip']),
+                ('DOMAIN', c['domain']),
+            )),
+            ('Ports', (
+                ('NPM_HTTP_PORT', c['npm_http_port']),
+                ('NPM_HTTPS_PORT', c['npm_https_port']),
+                ('NPM_ADMIN_PORT', c['npm_admin_port']),
+                ('GAME_SERVER_PORT', c['game_server_port']),
+                ('EPG_SERVER_PORT', c['epg_server_port']),
+                ('ERSATZTV_PORT', c['ersatztv_port']),
+            )),
+            ('Dynamic DNS', (
+                ('DUCKDNS_ENABLED', str(c['duckdns_enabled']).lower()),
+                ('DUCKDNS_SUBDOMAIN', c['duckdns_subdomain']),
+                ('DUCKDNS_TOKEN', c['duckdns_token']),
+            )),
+            ('Channels', (
+                ('WEB_CHANNELS', c['web_channels']),
+                ('PI_CHANNELS', c['pi_channels']),
+            )),
+            ('Raspberry Pi', (
+                ('PI_HOSTNAME', c['pi_hostname']),
+                ('PI_USER', c['pi_user']),
+                ('PI_DEFAULT_CHANNEL', c['pi_default_channel']),
+            )),
+            ('Backups', (
+                ('BACKUP_ENABLED', str(c['backup_enabled']).lower()),
+                ('BACKUP_PATH', c['backup_path']),
+                ('BACKUP_TIME', '03:00'),
+                ('BACKUP_RETENTION_DAYS', '30'),
+            )),
+            ('Version Pinning', (
+                ('NPM_IMAGE_VERSION', 'latest'),
+                ('NODE_IMAGE_VERSION', '20-alpine'),
+            )),
+        )
+        
+        lines = [ENV_HEADER]
+        for title, pairs in sections:
+            lines.append(f"\n# {title}")
+            lines.extend(f"{key}={env_value(value)}" for key, value in pairs)
+        write_file(install_path / '.env', '\n'.join(lines) + '\n')
     
-    def generate_nginx_config(self, install_path):
-        """Generate nginx advanced config"""
-        templates_dir = install_path / 'setup' / 'templates'
-        templates_dir.mkdir(parents=True, exist_ok=True)
-        
-        nginx_config = f"""# ===========================================
-# YLEM - Nginx Proxy Manager Advanced Config
-# Generated by Setup Wizard
-# Paste this into NPM → Hosts → Edit → Advanced
-# ===========================================
-
-# Serve index.html for root
-location = / {{
-    root /data;
-    try_files /index.html =404;
-}}
-
-# Serve watch.html for /chXXXX URLs
-location ~ ^/ch\\d+$ {{
-    root /data;
-    try_files /watch.html =404;
-}}
-
-# V2 Game Hub files
-location /v2/ {{
-    root /data;
-    try_files $uri $uri/ =404;
-}}
-
-# Games hub (clean URL)
-location = /games {{
-    root /data;
-    try_files /v2/games.html =404;
-}}
-
-# EPG Guide (clean URL)
-location = /guide {{
-    root /data;
-    try_files /v2/guide.html =404;
-}}
-
-# IPTV proxy (ErsatzTV streams)
-location /iptv/ {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['ersatztv_port']}/iptv/;
-    proxy_http_version 1.1;
-    proxy_set_header Host $host;
-    proxy_set_header Connection "";
-    proxy_buffering off;
-}}
-
-# WebSocket proxy for multiplayer
-location /ws/ {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['game_server_port']}/;
-    proxy_http_version 1.1;
-    proxy_set_header Upgrade $http_upgrade;
-    proxy_set_header Connection "upgrade";
-    proxy_set_header Host $host;
-    proxy_set_header X-Real-IP $remote_addr;
-    proxy_read_timeout 86400;
-}}
-
-# EPG API proxy
-location ^~ /api/epg {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['epg_server_port']};
-    proxy_http_version 1.1;
-    proxy_set_header Host $host;
-    proxy_set_header X-Real-IP $remote_addr;
-}}
-
-# Serve static files
-location ~ \\.(html|css|js|ico|png|jpg|svg|txt|json)$ {{
-    root /data;
-    try_files $uri =404;
-}}
-"""
+    def generate_nginx_config(self, templates_dir):
+        """Generate nginx advanced config into setup/templates"""
+        nginx_config = NGINX_TEMPLATE.format_map(self.config)
         config_path = templates_dir / 'nginx-advanced.conf'
-        config_path.write_text(nginx_config)
+        write_file(config_path, nginx_config)
     
-    def generate_pi_files(self, install_path):
-        """Generate Raspberry Pi configuration files"""
-        pi_dir = install_path / 'pi-client'
-        pi_dir.mkdir(parents=True, exist_ok=True)
-        
+    def generate_pi_files(self, pi_dir):
+        """Generate Raspberry Pi configuration files into pi-client"""
         # Simple stream startup script
-        startup_script = f"""#!/bin/bash
-# Ylem CRT TV Stream Startup
-# Generated by Setup Wizard
-
-HOST_IP="{self.config['host_ip']}"
-DEFAULT_CHANNEL="{self.config['pi_default_channel']}"
-
-# Wait for network
-sleep 5
-
-# Start MPV with the default channel
-mpv --no-terminal --fullscreen \\
-    --vo=gpu --hwdec=auto \\
-    "http://$HOST_IP:{self.config['ersatztv_port']}/iptv/channel/$DEFAULT_CHANNEL.m3u8"
-"""
-        (pi_dir / 'stream_startup.sh').write_text(startup_script)
+        startup_script = STREAM_STARTUP_TEMPLATE.format_map(self.config)
+        write_file(pi_dir / 'stream_startup.sh', startup_script)
     
     def copy_source_files(self, install_path):
         """Copy source files from wizard directory to install path"""
         # Get the directory where setup.py is located
         wizard_dir = Path(__file__).parent.parent
         
-        # Directories to copy
-        dirs_to_copy = ['data', 'web', 'epg-server', 'game-server', 'diagnostics', 'scripts']
-        
-        for dir_name in dirs_to_copy:
-            src = wizard_dir / dir_name
-            dst = install_path / dir_name
-            if src.exists() and not dst.exists():
-                shutil.copytree(src, dst, dirs_exist_ok=True)
+        # On the same volume, hard links avoid moving any file data (data/ holds media)
+        same_volume = os.stat(wizard_dir).st_dev == os.stat(install_path).st_dev
+        copy_function = link_or_copy if same_volume else shutil.copy2
+        
+        # The directories are independent and the work is I/O-bound, so sync them in parallel.
+        # Only missing or changed files are copied, so a redeploy picks up edited sources
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            copies = []
+            for dir_name in self._SOURCE_DIRS:
+                src = wizard_dir / dir_name
+                if src.exists():
+                    copies.append(pool.submit(sync_tree, src, install_path / dir_name, copy_function))
+            for copy in copies:
+                copy.result()  # Re-raise any copy error
         
         # Copy docker-compose.yml
         compose_src = wizard_dir / 'docker-compose.yml'
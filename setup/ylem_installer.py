@@ -8,19 +8,36 @@ Build with: pyinstaller --onefile --windowed --icon=ylem.ico ylem_installer.py
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import socket
-import subprocess
+from tkinter import ttk, messagebox
 import os
 import sys
 import json
-import zipfile
-import tempfile
+import mmap
+import queue
+import re
+import shutil
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import cache, partial
+from dataclasses import dataclass
 from pathlib import Path
-from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
 
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None  # Falls back to urlopen: a new TCP+TLS connection per request
+
+# Optional: orjson parses the releases API payload faster; both take bytes directly
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -29,70 +46,744 @@ GITHUB_USER = "xYIem"
 GITHUB_REPO = "YlemProject"
 GITHUB_RELEASE_URL = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/releases/latest"
 GITHUB_RAW_URL = f"https://raw.githubusercontent.com/{GITHUB_USER}/{GITHUB_REPO}/main"
+GITHUB_BRANCH_ZIP_URL = f"https://codeload.github.com/{GITHUB_USER}/{GITHUB_REPO}/zip/refs/heads/main"
+GITHUB_TREE_URL = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/git/trees/{{ref}}?recursive=1"
+# Every host a download touches; zipball_url redirects to codeload
+GITHUB_HOSTS = ('api.github.com', 'raw.githubusercontent.com', 'codeload.github.com')
 
 VERSION = "1.0.0"
 
+# Parallel GitHub downloads; each file is small, so latency dominates.
+# The raw fallback starts low and doubles while throughput keeps rising.
+DOWNLOAD_WORKERS_START = 4
+DOWNLOAD_WORKERS_MAX = 64
+
+USER_AGENT = f'YlemInstaller/{VERSION}'
+
+# GitHub's JSON endpoints compress to about a third when asked to
+API_HEADERS = {'Accept': 'application/vnd.github+json', 'Accept-Encoding': 'gzip, deflate'}
+
+# Archive members at least this big are streamed instead of read whole
+LARGE_MEMBER_SIZE = 256 << 10
+
+# Reuse a cached API response that came without an ETag for this long
+RELEASE_CACHE_TTL = 24 * 60 * 60
+
+# The install log keeps only this many recent lines
+LOG_MAX_LINES = 500
+
 # Component definitions
-COMPONENTS = {
-    'core': {
-        'name': 'Core (Required)',
-        'description': 'Nginx Proxy Manager, base configuration',
-        'required': True,
-        'files': [
-            'docker-compose.yml',
+@dataclass(frozen=True, slots=True)
+class Component:
+    key: str
+    name: str
+    description: str
+    required: bool = False
+    depends: tuple = ()
+    files: tuple = ()  # Repo paths; entries ending in / are whole folders
+    dirs: tuple = ()  # Install folders, all created before any file is written
+    raw_files: tuple = ()  # Single files fetched when no archive can be downloaded
+
+
+COMPONENTS = (
+    Component(
+        'core', 'Core (Required)', 'Nginx Proxy Manager, base configuration',
+        required=True,
+        files=(
+            # Not docker-compose.yml: build_docker_compose generates it from the config
             '.env.example',
             'data/index.html',
             'data/watch.html',
             'data/Images/',
-        ]
-    },
-    'tv': {
-        'name': 'TV Hub',
-        'description': 'ErsatzTV integration, channel streaming',
-        'required': False,
-        'files': [
+        ),
+        dirs=(
+            'data',
+            'data/Images',
+            'setup/templates',
+            'scripts',
+        ),
+        raw_files=(
+            'data/index.html',
+            'data/watch.html',
+        ),
+    ),
+    Component(
+        'tv', 'TV Hub', 'ErsatzTV integration, channel streaming',
+        files=(
             'epg-server/',
-        ]
-    },
-    'epg': {
-        'name': 'EPG Guide',
-        'description': 'Electronic Program Guide with now/next info',
-        'required': False,
-        'depends': ['tv'],
-        'files': [
+        ),
+        dirs=(
+            'epg-server',
+            'epg-server/logos',
+        ),
+        raw_files=(
+            'epg-server/epg-server.js',
+        ),
+    ),
+    Component(
+        'epg', 'EPG Guide', 'Electronic Program Guide with now/next info',
+        depends=('tv',),
+        files=(
             'web/v2/guide.html',
-        ]
-    },
-    'games': {
-        'name': 'Game Hub',
-        'description': 'Multiplayer games (Boggle, Scrabble)',
-        'required': False,
-        'files': [
+        ),
+        dirs=(
+            'data/v2',
+        ),
+        raw_files=(
+            'web/v2/guide.html',
+        ),
+    ),
+    Component(
+        'games', 'Game Hub', 'Multiplayer games (Boggle, Scrabble)',
+        files=(
             'game-server/',
             'web/v2/games.html',
             'web/v2/games/',
             'web/v2/css/',
             'web/v2/js/',
-        ]
-    },
-    'diagnostics': {
-        'name': 'Diagnostics Dashboard',
-        'description': 'System monitoring and Pi status',
-        'required': False,
-        'files': [
+        ),
+        dirs=(
+            'game-server',
+            'game-server/shared',
+            'data/v2/css',
+            'data/v2/js',
+            'data/v2/games',
+            'data/v2/games/boggle',
+            'data/v2/games/scrabble',
+        ),
+        raw_files=(
+            'game-server/server.js',
+            'game-server/package.json',
+            'game-server/shared/index.js',
+            'web/v2/games.html',
+            'web/v2/games/boggle/boggle.html',
+            'web/v2/games/scrabble/scrabble.html',
+            'web/v2/games/scrabble/lobby.html',
+            'web/v2/css/common.css',
+            'web/v2/css/auth.css',
+            'web/v2/css/game-common.css',
+            'web/v2/css/inventory.css',
+            'web/v2/css/leaderboard.css',
+            'web/v2/css/wager.css',
+            'web/v2/js/auth.js',
+            'web/v2/js/config.js',
+            'web/v2/js/dictionary.js',
+            'web/v2/js/inventory.js',
+            'web/v2/js/items.js',
+            'web/v2/js/leaderboard.js',
+            'web/v2/js/wager.js',
+        ),
+    ),
+    Component(
+        'diagnostics', 'Diagnostics Dashboard', 'System monitoring and Pi status',
+        files=(
             'diagnostics/',
-        ]
-    },
-    'pi_client': {
-        'name': 'Pi CRT Client',
-        'description': 'Raspberry Pi configuration for CRT TV',
-        'required': False,
-        'files': [
+        ),
+        dirs=(
+            'diagnostics',
+            'diagnostics/static',
+        ),
+        raw_files=(
+            'diagnostics/collector.py',
+            'diagnostics/requirements.txt',
+            'diagnostics/static/dashboard.html',
+        ),
+    ),
+    Component(
+        'pi_client', 'Pi CRT Client', 'Raspberry Pi configuration for CRT TV',
+        files=(
             'pi-client/',
-        ]
-    },
+        ),
+        dirs=(
+            'pi-client',
+            'pi-client/boot',
+            'pi-client/autostart',
+        ),
+        raw_files=(
+            'pi-client/pi_setup.sh',
+            'pi-client/stream_startup.sh',
+            'pi-client/tv_control.py',
+            'pi-client/pi_reporter.py',
+            'pi-client/boot/config.txt',
+            'pi-client/boot/cmdline.txt',
+        ),
+    ),
+)
+
+COMPONENTS_BY_KEY = {comp.key: comp for comp in COMPONENTS}
+
+
+@dataclass(frozen=True, slots=True)
+class InstallPlan:
+    """What to install for one selection of components, fixed when the summary is confirmed"""
+    components: frozenset  # Keys of the components being installed, required ones included
+    dirs: tuple  # Install folders
+    files: tuple  # Repo paths to take from an archive; entries ending in / are whole folders
+    raw_files: tuple  # (repo path, install path) pairs for the one-by-one fallback
+
+
+# Repo folders that install somewhere else (nginx serves /data/data/v2)
+PATH_REMAP = (
+    ('web/v2/', 'data/v2/'),
+)
+
+
+def local_path(repo_path):
+    """Map a path in the repository to its location under the install folder"""
+    for src, dst in PATH_REMAP:
+        if repo_path.startswith(src):
+            return dst + repo_path[len(src):]
+    return repo_path
+
+
+def fetch_tree(ref):
+    """{repo path: git blob SHA-1} for every file at ref, from a single API request"""
+    tree = fetch_json(GITHUB_TREE_URL.format(ref=ref), 'tree-' + re.sub(r'[^\w.-]', '_', ref))
+    return {entry['path']: entry['sha'] for entry in tree['tree'] if entry['type'] == 'blob'}
+
+
+def git_blob_sha(path):
+    """Git's blob SHA-1 of a local file (what the tree API reports), or None if it is missing"""
+    import hashlib  # Deferred from startup: OpenSSL only loads once an install compares files
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            digest = hashlib.sha1(b'blob %d\0' % size)
+            if size:  # mmap can't map an empty file
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    digest.update(mm)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def changed_paths(install_path, tree, repo_paths):
+    """The repo_paths whose installed copy is missing or differs from tree"""
+    repo_paths = list(repo_paths)
+    # hashlib releases the GIL on large buffers, so hash the local files in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='ylem-hash') as pool:
+        local_shas = pool.map(git_blob_sha, (install_path / local_path(path) for path in repo_paths))
+        return {path for path, sha in zip(repo_paths, local_shas) if sha != tree.get(path)}
+
+
+def path_matcher(paths):
+    """Compiled match() for repo paths equal to, or inside, any of paths (folders end in /)"""
+    alternatives = '|'.join(re.escape(path.rstrip('/')) for path in paths)
+    return re.compile(f'(?:{alternatives})(?:/|$)').match
+
+
+def make_dirs(root, rel_dirs):
+    """Create each folder under root, and its parents, with one mkdir per distinct folder"""
+    # makedirs stats every ancestor on every call; sibling folders share most of them
+    needed = set()
+    for rel_dir in rel_dirs:
+        parts = rel_dir.replace('\\', '/').strip('/').split('/')
+        if parts[0]:
+            needed.update('/'.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+    
+    os.makedirs(root, exist_ok=True)
+    for rel_dir in sorted(needed, key=lambda d: d.count('/')):  # Parents first
+        try:
+            os.mkdir(root / rel_dir)
+        except FileExistsError:
+            pass
+
+
+# O_BINARY stops Windows from translating newlines; the data is written exactly as given
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+
+def write_file(path, data):
+    """Write bytes with one open and (usually) one write syscall"""
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_if_changed(path, data):
+    """Write data (bytes) to path unless the file already holds exactly that; True if written"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == len(data):
+                if not data:
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    if view == data:
+                        return False
+    except FileNotFoundError:
+        pass
+    
+    write_file(path, data)
+    return True
+
+
+def write_files(files):
+    """Write (path, bytes) pairs concurrently, skipping unchanged ones; yields (path, written) as each lands"""
+    with ThreadPoolExecutor(max_workers=max(1, min(len(files), 8)), thread_name_prefix='ylem-write') as pool:
+        futures = {pool.submit(write_if_changed, path, data): path for path, data in files}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def batch_bytes(script):
+    """A cmd.exe script encoded with the CRLF line endings it expects, on any platform"""
+    return script.replace('\n', '\r\n').encode('utf-8')
+
+
+def write_batch_file(path, script):
+    """Write a cmd.exe script; True if it changed"""
+    return write_if_changed(path, batch_bytes(script))
+
+
+def preallocate(fd, size):
+    """Reserve size bytes for a file about to be written, where the OS allows it"""
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)  # SetEndOfFile on Windows
+    except OSError:
+        pass  # Filesystem without fallocate support; the writes still work
+
+
+# Keep-alive connections to GitHub, shared by every download thread
+_http = None
+if urllib3 is not None:
+    _http = urllib3.PoolManager(num_pools=4, maxsize=DOWNLOAD_WORKERS_MAX, block=False,
+                                retries=urllib3.Retry(total=3, backoff_factor=0.3,
+                                                      status_forcelist=(502, 503, 504)))
+
+
+@contextmanager
+def http_get(url, headers=None, timeout=30):
+    """GET url as a readable response, reusing pooled connections when urllib3 is available"""
+    headers = {'User-Agent': USER_AGENT, **(headers or {})}
+    if _http is None:
+        from urllib.request import urlopen, Request
+        # urlopen hands back compressed bodies as-is; gzip is the one decoded below
+        if 'Accept-Encoding' in headers:
+            headers['Accept-Encoding'] = 'gzip'
+        with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+            if response.headers.get('Content-Encoding') != 'gzip':
+                yield response
+                return
+            import gzip
+            with gzip.GzipFile(fileobj=response) as body:
+                body.headers = response.headers  # What callers read besides the body
+                yield body
+        return
+    
+    try:
+        response = _http.request('GET', url, headers=headers, timeout=timeout, preload_content=False)
+    except urllib3.exceptions.HTTPError as e:
+        raise URLError(e) from e
+    
+    try:
+        # Same failure type as urlopen, so callers handle both backends alike
+        if response.status >= 300:
+            raise HTTPError(url, response.status, response.reason, response.headers, None)
+        yield response
+    except BaseException:
+        response.close()
+        raise
+    else:
+        response.release_conn()  # Back to the pool instead of closing the socket
+
+
+def warm_dns(hosts=GITHUB_HOSTS):
+    """Resolve hosts once so the OS resolver cache answers every pooled connection's lookup"""
+    import socket
+    for host in hosts:
+        try:
+            socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+        except OSError:
+            pass  # Offline; the download reports it
+
+
+def command_succeeds(cmd, timeout):
+    """True if cmd runs and exits 0 within timeout seconds"""
+    import subprocess  # Like the other rarely-needed modules, only loaded when used
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=timeout).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def open_console(batch_path, cwd):
+    """Run a batch file in its own console window without waiting for it"""
+    import subprocess
+    # The console comes straight from CreateProcess: no 'cmd /c start' hop, and
+    # no '/k' either, since the scripts end with their own pause
+    subprocess.Popen(['cmd', '/c', str(batch_path)], cwd=str(cwd),
+                     creationflags=getattr(subprocess, 'CREATE_NEW_CONSOLE', 0))
+
+
+def open_folder(path):
+    """Show path in Explorer; returns at once, unlike os.startfile while shell extensions load"""
+    import subprocess
+    subprocess.Popen(['explorer', str(path)])
+
+
+def port_open(port, host='localhost', timeout=0.3):
+    """True if something accepts TCP connections on host:port"""
+    import socket
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_prerequisites():
+    """Docker and ErsatzTV status for the components page, with all the probes run at once"""
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix='ylem-probe') as pool:
+        docker = pool.submit(command_succeeds, ['docker', '--version'], 5)
+        running = pool.submit(command_succeeds, ['docker', 'ps'], 10)
+        # A TCP connect is enough to see ErsatzTV is up, and much quicker than an HTTP GET
+        ports = [(port, pool.submit(port_open, int(port))) for port in ('8409', '8410')]
+        
+        status = {'docker': docker.result()}
+        status['docker_running'] = status['docker'] and running.result()
+        status['ersatztv'] = False
+        for port, is_open in ports:
+            if is_open.result():
+                status['ersatztv'] = True
+                status['ersatztv_port'] = port
+                break
+    return status
+
+
+def cache_dir():
+    """Per-user folder for installer state (%LOCALAPPDATA%\\Ylem on Windows)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(Path.home(), '.cache')
+    return Path(base) / 'Ylem'
+
+
+@cache
+def writable_cache_dir():
+    """cache_dir(), created on first use; later writes skip the mkdir (raises OSError)"""
+    path = cache_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_state():
+    """Settings remembered from earlier runs ({} on the first)"""
+    try:
+        return loads((cache_dir() / 'installer.json').read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(**values):
+    """Best effort: merge values into the remembered settings"""
+    try:
+        state_path = writable_cache_dir() / 'installer.json'
+        tmp_path = state_path.with_suffix('.tmp')
+        write_file(tmp_path, json.dumps({**load_state(), **values}).encode('utf-8'))
+        os.replace(tmp_path, state_path)
+    except OSError:
+        pass
+
+
+class AdaptiveLimiter:
+    """Caps concurrent downloads, doubling the cap while each window beats the last by 10%"""
+    
+    def __init__(self, start, ceiling, window=2.0):
+        self.limit = start
+        self._ceiling = ceiling
+        self._window = window
+        self._gate = threading.Semaphore(start)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._window_start = time.monotonic()
+        self._last_rate = 0.0
+        self._settled = start >= ceiling
+    
+    def __enter__(self):
+        self._gate.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        self._gate.release()
+    
+    def record(self, nbytes):
+        """Count a finished transfer; at each window's end, grow the cap or hold it for good"""
+        with self._lock:
+            self._bytes += nbytes
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if self._settled or elapsed < self._window:
+                return
+            
+            rate = self._bytes / elapsed
+            self._bytes = 0
+            self._window_start = now
+            if rate > self._last_rate * 1.1:
+                extra = min(self.limit, self._ceiling - self.limit)
+                self.limit += extra
+                for _ in range(extra):
+                    self._gate.release()  # Extra permits let waiting workers in
+                self._settled = self.limit >= self._ceiling
+            else:
+                self._settled = True  # Plateaued
+            self._last_rate = rate
+
+
+def fetch_json(url, cache_name):
+    """GitHub API JSON, revalidated against a disk cache (cache_name-cache.json) with If-None-Match"""
+    cache_path = cache_dir() / f'{cache_name}-cache.json'
+    try:
+        cached = loads(cache_path.read_bytes())
+        cache_age = time.time() - cache_path.stat().st_mtime
+    except (OSError, ValueError):
+        cached = None
+    if not isinstance(cached, dict) or 'data' not in cached:
+        cached = None  # Missing, or written by an older installer
+    
+    headers = dict(API_HEADERS)
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        elif cache_age < RELEASE_CACHE_TTL:
+            return cached['data']
+    
+    try:
+        with http_get(url, headers=headers) as response:
+            body = response.read()
+            etag = response.headers.get('ETag')
+    except HTTPError as e:
+        if e.code == 304 and cached:
+            return cached['data']  # Unchanged; 304s don't count against the rate limit
+        raise
+    except URLError:
+        if cached:
+            return cached['data']  # Offline re-run
+        raise
+    
+    data = loads(body)
+    
+    # Best effort: write a temp file and swap it in, so a crash never leaves half a cache
+    try:
+        tmp_path = writable_cache_dir() / cache_path.with_suffix('.tmp').name
+        write_file(tmp_path, json.dumps({'etag': etag, 'data': data}).encode('utf-8'))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return data
+
+
+def fetch_release():
+    """Latest release JSON"""
+    return fetch_json(GITHUB_RELEASE_URL, 'release')
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TEMPLATES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Generated files, built once at import; the build_* methods fill in the
+# {placeholders} from the install config with format_map
+
+ENV_TEMPLATE = """# Ylem Configuration
+# Generated by Ylem Installer
+
+# Network
+HOST_IP={host_ip}
+DOMAIN={domain}
+
+# Ports
+NPM_HTTP_PORT={npm_http_port}
+NPM_HTTPS_PORT={npm_https_port}
+NPM_ADMIN_PORT={npm_admin_port}
+GAME_SERVER_PORT={game_server_port}
+EPG_SERVER_PORT={epg_server_port}
+ERSATZTV_PORT={ersatztv_port}
+
+# DuckDNS (Dynamic DNS)
+DUCKDNS_ENABLED={duckdns_enabled}
+DUCKDNS_SUBDOMAIN={duckdns_subdomain}
+DUCKDNS_TOKEN={duckdns_token}
+
+# Channels are automatically loaded from ErsatzTV
+# No manual configuration needed!
+"""
+
+# Pasted into NPM's Advanced tab; {{ }} are nginx braces
+NGINX_TEMPLATE = """# Ylem - Nginx Proxy Manager Advanced Config
+# Paste into NPM -> Proxy Host -> Advanced
+
+location = / {{
+    root /data/data;
+    try_files /index.html =404;
+}}
+
+location ~ ^/ch\\d+$ {{
+    root /data/data;
+    try_files /watch.html =404;
+}}
+
+location /iptv/ {{
+    proxy_pass http://{host_ip}:{ersatztv_port}/iptv/;
+    proxy_http_version 1.1;
+    proxy_buffering off;
+}}
+"""
+
+NGINX_GAMES_BLOCK = """
+location /ws/ {{
+    proxy_pass http://{host_ip}:{game_server_port}/;
+    proxy_http_version 1.1;
+    proxy_set_header Upgrade $http_upgrade;
+    proxy_set_header Connection "upgrade";
+    proxy_read_timeout 86400;
+}}
+
+location /v2/ {{
+    root /data/data;
+    try_files $uri $uri/ =404;
+}}
+
+location = /games {{
+    root /data/data;
+    try_files /v2/games.html =404;
+}}
+"""
+
+NGINX_TV_BLOCK = """
+location ^~ /api/epg {{
+    proxy_pass http://{host_ip}:{epg_server_port};
+    proxy_http_version 1.1;
+}}
+
+location = /guide {{
+    root /data/data;
+    try_files /v2/guide.html =404;
+}}
+"""
+
+# Every (games, tv) combination joined ahead of time, so a config is one format_map
+NGINX_VARIANTS = {
+    (games, tv): NGINX_TEMPLATE + (NGINX_GAMES_BLOCK if games else '') + (NGINX_TV_BLOCK if tv else '')
+    for games in (False, True) for tv in (False, True)
+}
+
+COMPOSE_TEMPLATE = """services:
+  app:
+    image: 'jc21/nginx-proxy-manager:latest'
+    container_name: ylem-npm
+    restart: unless-stopped
+    ports:
+      - '{npm_http_port}:80'
+      - '{npm_https_port}:443'
+      - '{npm_admin_port}:81'
+    volumes:
+      - ./npm-data:/data
+      - ./letsencrypt:/etc/letsencrypt
+      - ./data:/data/data:ro
+    extra_hosts:
+      - "host.docker.internal:host-gateway"
+"""
+
+COMPOSE_EPG_SERVICE = """
+  epg-server:
+    image: 'node:20-alpine'
+    container_name: ylem-epg-server
+    restart: unless-stopped
+    working_dir: /app
+    command: node epg-server.js
+    ports:
+      - '{epg_server_port}:3001'
+    volumes:
+      - ./epg-server:/app
+    environment:
+      - PORT=3001
+      - HOST_IP={host_ip}
+      - ERSATZTV_PORT={ersatztv_port}
+    extra_hosts:
+      - "host.docker.internal:host-gateway"
+"""
+
+COMPOSE_GAME_SERVICE = """
+  game-server:
+    image: 'node:20-alpine'
+    container_name: ylem-game-server
+    restart: unless-stopped
+    working_dir: /app
+    command: sh -c "npm install && node server.js"
+    ports:
+      - '{game_server_port}:3000'
+    volumes:
+      - ./game-server:/app
+    environment:
+      - PORT=3000
+"""
+
+# Joined per (games, tv) combination like the nginx variants; services keep this order
+COMPOSE_VARIANTS = {
+    (games, tv): COMPOSE_TEMPLATE + (COMPOSE_EPG_SERVICE if tv else '') + (COMPOSE_GAME_SERVICE if games else '')
+    for games in (False, True) for tv in (False, True)
 }
 
+# start.bat and stop.bat differ only in the verb, the compose command and what they print after it
+BAT_TEMPLATE = """@echo off
+echo {verb} Ylem...
+cd /d "{install_path}"
+docker-compose {command}
+{after}pause
+"""
+
+BAT_SCRIPTS = (
+    ('start.bat', 'Starting', 'up -d', """echo.
+echo Ylem is running!
+echo   Web: http://{host_ip}:{npm_http_port}
+echo   Admin: http://{host_ip}:{npm_admin_port}
+"""),
+    ('stop.bat', 'Stopping', 'down', """echo Ylem stopped.
+"""),
+)
+
+# Run from the setup page's Docker buttons; they keep the CMD window open for the output
+DOCKER_START_BAT = """@echo off
+cd /d "{install_path}"
+echo.
+echo ========================================
+echo   Starting Ylem Docker Containers
+echo ========================================
+echo.
+echo Running: docker-compose up -d
+echo.
+docker-compose up -d
+echo.
+echo ========================================
+echo   Docker Status
+echo ========================================
+echo.
+docker ps
+echo.
+echo ----------------------------------------
+echo Press any key to close this window...
+pause >nul
+"""
+
+DOCKER_STOP_BAT = """@echo off
+cd /d "{install_path}"
+echo.
+echo ========================================
+echo   Stopping Ylem Docker Containers
+echo ========================================
+echo.
+docker-compose down
+echo.
+echo Done! Containers stopped.
+echo.
+pause
+"""
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN APPLICATION
@@ -141,6 +832,8 @@ class YlemInstaller:
             'backup_path': '',
             'install_path': '',  # Empty - user must set
         }
+        self._ip_auto_detected = False  # Showing the network page detects at most once
+        self._nginx_text = None  # Set by build_nginx_config, for the setup page's copy buttons
         
         # Selected components
         self.selected_components = {
@@ -156,6 +849,15 @@ class YlemInstaller:
         self.current_page = 0
         self.pages = []
         
+        # Worker threads never touch Tk; they queue updates for _drain_ui_queue
+        self._ui_queue = queue.Queue()
+        self._log_buf = []  # Lines held by log_add until log_flush
+        self._log_lock = threading.Lock()
+        # Short background jobs (probes, IP detection, DNS warm-up) share this one pool
+        self._exec = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ylem')
+        self._check_prerequisites()  # The components page shows "Checking..." until it lands
+        self._exec.submit(warm_dns)  # While the user works through the pages
+        
         # Style
         style = ttk.Style()
         style.configure('Header.TLabel', font=('Segoe UI', 16, 'bold'))
@@ -204,6 +906,13 @@ class YlemInstaller:
         # Build pages
         self.build_pages()
         self.show_page(0)
+        self.root.after(50, self._drain_ui_queue)
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
+    
+    def close(self):
+        """Close the window, dropping background jobs that haven't started yet"""
+        self._exec.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
     
     def build_pages(self):
         """Define all wizard pages"""
@@ -256,7 +965,7 @@ class YlemInstaller:
             else:
                 self.next_btn.config(text="Installing...", state=tk.DISABLED)
         elif index == 4:  # Setup page (index 4)
-            self.next_btn.config(text="Finish", command=self.root.quit, state=tk.NORMAL)
+            self.next_btn.config(text="Finish", command=self.close, state=tk.NORMAL)
         else:
             self.next_btn.config(text="Next →", command=self.next_page, state=tk.NORMAL)
         
@@ -307,7 +1016,22 @@ class YlemInstaller:
             self.config['duckdns_enabled'] = self.duckdns_enabled_var.get()
             self.config['duckdns_subdomain'] = self.duckdns_subdomain_var.get()
             self.config['duckdns_token'] = self.duckdns_token_var.get()
+            # The config is final now; Back/Next through the summary just redraws this
+            self._summary_text = self._build_summary_text()
+        elif self.current_page == 2:  # Summary page: the selection can't change any more
+            self._plan = self._build_plan()
         return True
+    
+    def _build_plan(self):
+        """An InstallPlan for the components currently ticked"""
+        chosen = [comp for comp in COMPONENTS
+                  if comp.required or self.selected_components[comp.key].get()]
+        return InstallPlan(
+            components=frozenset(comp.key for comp in chosen),
+            dirs=tuple(d for comp in chosen for d in comp.dirs),
+            files=tuple(path for comp in chosen for path in comp.files),
+            raw_files=tuple((path, local_path(path)) for comp in chosen for path in comp.raw_files),
+        )
 
     # ═══════════════════════════════════════════════════════════════════════════
     # PAGE 1: Component Selection
@@ -324,21 +1048,22 @@ class YlemInstaller:
         components_frame = ttk.LabelFrame(frame, text="Components", padding="10")
         components_frame.pack(fill=tk.X, pady=(0, 10))
         
-        for key, comp in COMPONENTS.items():
-            comp_frame = ttk.Frame(components_frame)
-            comp_frame.pack(fill=tk.X, pady=2)
-            
-            cb = ttk.Checkbutton(
-                comp_frame, 
-                text=comp['name'],
-                variable=self.selected_components[key],
-                state=tk.DISABLED if comp.get('required') else tk.NORMAL
-            )
-            cb.pack(side=tk.LEFT)
-            
-            ttk.Label(comp_frame, text=f"  - {comp['description']}", 
-                      foreground='gray').pack(side=tk.LEFT)
-        
+        # One Treeview instead of a frame, checkbutton and label per component
+        tree = ttk.Treeview(components_frame, columns=('desc',), show='tree',
+                            height=len(COMPONENTS), selectmode='none')
+        tree.column('#0', width=210, stretch=False)
+        tree.column('desc', width=420)
+        tree.tag_configure('required', foreground='gray')
+        tree.tag_configure('optional', foreground='black')
+        
+        for comp in COMPONENTS:
+            tree.insert('', tk.END, iid=comp.key, text=self._component_label(comp.key),
+                        values=(comp.description,),
+                        tags=('required' if comp.required else 'optional',))
+        
+        tree.bind('<Button-1>', lambda e: self._toggle_component(tree, e))
+        tree.pack(fill=tk.X)
+    
         # Install path
         path_frame = ttk.LabelFrame(frame, text="Installation Path (Required)", padding="10")
         path_frame.pack(fill=tk.X, pady=(10, 5))
@@ -358,9 +1083,18 @@ class YlemInstaller:
         prereq_frame = ttk.LabelFrame(frame, text="Prerequisites", padding="10")
         prereq_frame.pack(fill=tk.X, pady=(5, 0))
         
-        # Check prerequisites
-        self.prereq_status = {}
-        self._check_prerequisites()
+        self.prereq_frame = prereq_frame
+        self._populate_prereqs()
+    
+    def _populate_prereqs(self):
+        """Draw the prerequisite rows from self.prereq_status (Tk thread only)"""
+        prereq_frame = self.prereq_frame
+        for child in prereq_frame.winfo_children():
+            child.destroy()
+        
+        if self.prereq_status is None:
+            ttk.Label(prereq_frame, text="Checking for Docker and ErsatzTV...", foreground='gray').pack(anchor='w', pady=2)
+            return
         
         # Docker Desktop
         docker_frame = ttk.Frame(prereq_frame)
@@ -416,45 +1150,38 @@ class YlemInstaller:
         btn_frame = ttk.Frame(prereq_frame)
         btn_frame.pack(fill=tk.X, pady=(10, 0))
         ttk.Button(btn_frame, text="🔄 Recheck", command=self._refresh_prerequisites).pack(side=tk.LEFT)
+    
+    def _component_label(self, key):
+        """Checkbox glyph plus name for a component row"""
+        mark = '☑' if self.selected_components[key].get() else '☐'
+        return f"{mark} {COMPONENTS_BY_KEY[key].name}"
+    
+    def _toggle_component(self, tree, event):
+        """Click on a component row: flip its selection unless it is required"""
+        key = tree.identify_row(event.y)
+        if not key or COMPONENTS_BY_KEY[key].required:
+            return
         
-        # Store frame reference for refresh
-        self._prereq_frame_parent = frame
+        var = self.selected_components[key]
+        var.set(not var.get())
+        tree.item(key, text=self._component_label(key))
     
     def _check_prerequisites(self):
-        """Check if required programs are installed"""
-        # Check Docker
-        try:
-            result = subprocess.run(['docker', '--version'], capture_output=True, text=True, timeout=5)
-            self.prereq_status['docker'] = result.returncode == 0
-        except:
-            self.prereq_status['docker'] = False
-        
-        # Check if Docker is running
-        if self.prereq_status['docker']:
-            try:
-                result = subprocess.run(['docker', 'ps'], capture_output=True, text=True, timeout=10)
-                self.prereq_status['docker_running'] = result.returncode == 0
-            except:
-                self.prereq_status['docker_running'] = False
-        else:
-            self.prereq_status['docker_running'] = False
-        
-        # Check ErsatzTV (try to connect to default port)
-        self.prereq_status['ersatztv'] = False
-        for port in ['8409', '8410']:
-            try:
-                import urllib.request
-                req = urllib.request.urlopen(f'http://localhost:{port}', timeout=2)
-                self.prereq_status['ersatztv'] = True
-                self.prereq_status['ersatztv_port'] = port
-                break
-            except:
-                pass
+        """Probe the prerequisites off the Tk thread; the result comes back through the UI queue"""
+        self.prereq_status = None  # Checking
+        future = self._exec.submit(probe_prerequisites)
+        future.add_done_callback(lambda f: self._ui_queue.put(('prereqs', f.result())))
+    
+    def _apply_prereqs(self, status):
+        """Show probe results (Tk thread only); later visits to the page reuse them"""
+        self.prereq_status = status
+        if self._alive('prereq_frame'):
+            self._populate_prereqs()
     
     def _refresh_prerequisites(self):
-        """Refresh prerequisite checks and redraw page"""
+        """Re-probe the prerequisites, redrawing only their frame"""
         self._check_prerequisites()
-        self.show_page(0)  # Redraw the components page
+        self._populate_prereqs()  # "Checking..." until the new result arrives
     
     def open_url(self, url):
         """Open URL in default browser"""
@@ -462,6 +1189,7 @@ class YlemInstaller:
         webbrowser.open(url)
     
     def browse_install_path(self):
+        from tkinter import filedialog
         path = filedialog.askdirectory(title="Select Installation Folder")
         if path:
             self.install_path_var.set(path)
@@ -579,44 +1307,49 @@ class YlemInstaller:
         self.duckdns_token_var = tk.StringVar(value=self.config['duckdns_token'])
         ttk.Entry(duck_row, textvariable=self.duckdns_token_var, width=20, show='*').pack(side=tk.LEFT, padx=5)
         
-        # Auto-detect IP on page load
-        if not self.config['host_ip']:
+        # Auto-detect IP on the first visit; after that (even if it failed) only the button does
+        if not self.config['host_ip'] and not self._ip_auto_detected:
+            self._ip_auto_detected = True
             self.detect_ip()
     
     def detect_ip(self):
-        """Auto-detect local IP"""
+        """Auto-detect local IP off the Tk thread; the result comes back through the UI queue"""
+        future = self._exec.submit(self._detect_ip_blocking)
+        future.add_done_callback(lambda f: self._ui_queue.put(('ip', f.result())))
+    
+    def _detect_ip_blocking(self):
+        """Local IP of the default route, or None"""
+        import socket
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
+            # A UDP connect only picks the route; no packet is sent, so nothing to wait for
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                return s.getsockname()[0]
+        except OSError:
+            return None
+    
+    def _apply_ip(self, ip):
+        """Show a detected IP (Tk thread only)"""
+        if ip:
             self.host_ip_var.set(ip)
             self.config['host_ip'] = ip
-        except Exception:
-            messagebox.showwarning("Auto-Detect Failed", 
-                "Could not detect IP. Please enter manually.")
-
-    # ═══════════════════════════════════════════════════════════════════════════
-    # PAGE 3: Summary
-    # ═══════════════════════════════════════════════════════════════════════════
-    def create_summary_page(self):
-        frame = ttk.Frame(self.page_frame)
-        frame.pack(fill=tk.BOTH, expand=True)
-        
-        ttk.Label(frame, text="Installation Summary", style='Header.TLabel').pack(anchor='w')
-        ttk.Label(frame, text="Review your configuration", 
-                  style='SubHeader.TLabel').pack(anchor='w', pady=(0, 20))
-        
-        # Collect final config
-        self.config['install_path'] = self.install_path_var.get()
+        else:
+            messagebox.showwarning("Auto-Detect Failed", 
+                "Could not detect IP. Please enter manually.")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PAGE 3: Summary
+    # ═══════════════════════════════════════════════════════════════════════════
+    def _build_summary_text(self):
+        """The summary page's text for the current config and selection"""
+        selected = {key: var.get() for key, var in self.selected_components.items()}
         
         # Components list
         components_str = ', '.join([
-            COMPONENTS[k]['name'] for k, v in self.selected_components.items() 
-            if v.get()
+            COMPONENTS_BY_KEY[k].name for k, on in selected.items() if on
         ])
         
-        summary = f"""Components: {components_str}
+        parts = [f"""Components: {components_str}
 
 Install Path: {self.config['install_path']}
 
@@ -625,23 +1358,32 @@ Network:
   Domain: {self.config['domain'] or '(local only)'}
 
 Ports:
-  HTTP: {self.config['npm_http_port']}  HTTPS: {self.config['npm_https_port']}  Admin: {self.config['npm_admin_port']}"""
+  HTTP: {self.config['npm_http_port']}  HTTPS: {self.config['npm_https_port']}  Admin: {self.config['npm_admin_port']}"""]
         
-        if self.selected_components['games'].get():
-            summary += f"\n  Game Server: {self.config['game_server_port']}"
-        if self.selected_components['tv'].get():
-            summary += f"\n  EPG Server: {self.config['epg_server_port']}"
+        if selected['games']:
+            parts.append(f"\n  Game Server: {self.config['game_server_port']}")
+        if selected['tv']:
+            parts.append(f"\n  EPG Server: {self.config['epg_server_port']}")
         
         if self.config['duckdns_enabled']:
-            summary += f"\n\nDuckDNS: {self.config['duckdns_subdomain']}.duckdns.org"
+            parts.append(f"\n\nDuckDNS: {self.config['duckdns_subdomain']}.duckdns.org")
         
         if self.config['web_channels']:
-            summary += f"\n\nWeb Channels: {self.config['web_channels'][:50]}..."
+            parts.append(f"\n\nWeb Channels: {self.config['web_channels'][:50]}...")
+        
+        return ''.join(parts)
+    
+    def create_summary_page(self):
+        frame = ttk.Frame(self.page_frame)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(frame, text="Installation Summary", style='Header.TLabel').pack(anchor='w')
+        ttk.Label(frame, text="Review your configuration", 
+                  style='SubHeader.TLabel').pack(anchor='w', pady=(0, 20))
         
-        text = tk.Text(frame, height=16, width=70, font=('Consolas', 10))
-        text.insert('1.0', summary)
-        text.config(state=tk.DISABLED)
-        text.pack(pady=10)
+        # Built by validate_page; read-only, so a Label: much cheaper than a Text
+        ttk.Label(frame, text=self._summary_text, font=('Consolas', 10), justify=tk.LEFT,
+                  anchor='nw', wraplength=560).pack(fill=tk.BOTH, expand=True, pady=10)
         
         ttk.Label(frame, text="Click 'Install' to download and configure Ylem",
                   foreground='blue').pack()
@@ -671,107 +1413,159 @@ Ports:
         self.log_text.config(yscrollcommand=scrollbar.set)
     
     def log(self, message):
-        """Add message to log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+        """Add message to log (safe from any thread)"""
+        self._ui_queue.put(('log', message))
+    
+    def log_add(self, message):
+        """Hold a log line until the next log_flush (safe from any thread)"""
+        with self._log_lock:
+            self._log_buf.append(message)
+    
+    def log_flush(self):
+        """Queue every held line as one log entry, at the end of a phase"""
+        with self._log_lock:
+            lines, self._log_buf = self._log_buf, []
+        if lines:
+            self.log('\n'.join(lines))
+    
+    def _set_progress(self, value, status=None):
+        """Queue a progress bar value and/or status text for the Tk thread"""
+        if value is not None:
+            self._ui_queue.put(('progress', value))
+        if status is not None:
+            self._ui_queue.put(('status', status))
+    
+    def _drain_ui_queue(self):
+        """Apply queued worker updates on the Tk thread, then poll again"""
+        lines = []
+        latest = {}  # Only the newest progress value and status text are worth drawing
+        updates = []
+        # Everything queued when the tick starts, so a burst lands in one go but
+        # items a worker keeps adding meanwhile wait for the next tick
+        for _ in range(self._ui_queue.qsize()):
+            try:
+                kind, value = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                lines.append(value)
+            elif kind in ('progress', 'status'):
+                latest[kind] = value
+            else:
+                updates.append((kind, value))
+        
+        # One insert and one scroll per tick, however many lines arrived; lines the
+        # trim below would drop straight away are never inserted
+        lines = lines[-LOG_MAX_LINES:]
+        if lines and self._alive('log_text'):
+            self.log_text.insert(tk.END, '\n'.join(lines) + '\n')
+            # end-1c sits on the empty line after the final newline
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+        
+        # The install page widgets only exist while that page is shown
+        if latest and self._alive('install_progress'):
+            if 'progress' in latest:
+                self.install_progress['value'] = latest['progress']
+            if 'status' in latest:
+                self.status_var.set(latest['status'])
+        
+        for kind, value in updates:
+            if kind == 'ip':
+                self._apply_ip(value)
+            elif kind == 'prereqs':
+                self._apply_prereqs(value)
+            elif kind == 'done':
+                # Set here rather than by the worker, so page logic never sees it early
+                self.installation_complete = True
+                self.final_install_path = value
+                self._show_install_complete_buttons(value)
+            elif kind == 'error':
+                messagebox.showerror("Error", value)
+        
+        self.root.after(50, self._drain_ui_queue)
+    
+    def _alive(self, name):
+        """True if the widget stored on self.<name> is still on screen"""
+        widget = getattr(self, name, None)
+        return widget is not None and widget.winfo_exists()
     
     def start_installation(self):
-        """Begin the installation process in a thread"""
-        thread = threading.Thread(target=self.run_installation)
+        """Begin the installation process in a daemon thread, so closing the window stops it"""
+        thread = threading.Thread(target=self.run_installation, name='ylem-install', daemon=True)
         thread.start()
     
     def run_installation(self):
         """Main installation logic"""
         try:
-            install_path = Path(self.config['install_path'])
+            # One snapshot for every generator: a late IP detection can still
+            # update self.config from the Tk thread while they run
+            self._cfg = dict(self.config)
+            install_path = Path(self._cfg['install_path'])
             total_steps = 6
             step = 0
             
             # Step 1: Create directories
             step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Creating directories...")
+            self._set_progress((step / total_steps) * 100, "Creating directories...")
             self.log("📁 Creating installation directories...")
             
-            dirs = ['data', 'data/Images', 'setup/templates', 'scripts']
-            if self.selected_components['games'].get():
-                dirs.extend(['game-server', 'game-server/shared', 'data/v2/css', 'data/v2/js', 'data/v2/games', 'data/v2/games/boggle', 'data/v2/games/scrabble'])
-            if self.selected_components['epg'].get():
-                dirs.extend(['data/v2'])
-            if self.selected_components['tv'].get():
-                dirs.extend(['epg-server', 'epg-server/logos'])
-            if self.selected_components['diagnostics'].get():
-                dirs.extend(['diagnostics', 'diagnostics/static'])
-            if self.selected_components['pi_client'].get():
-                dirs.extend(['pi-client', 'pi-client/boot', 'pi-client/autostart'])
-            
-            for d in dirs:
-                (install_path / d).mkdir(parents=True, exist_ok=True)
-                self.log(f"  ✓ {d}/")
-            
-            # Step 2: Download files from GitHub
-            step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Downloading from GitHub...")
-            self.log("\n📥 Downloading files from GitHub...")
-            
-            self.download_github_files(install_path)
-            
-            # Step 3: Generate .env file
-            step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Generating configuration...")
-            self.log("\n⚙️ Generating .env file...")
-            
-            self.generate_env_file(install_path)
-            self.log("  ✓ .env created")
-            
-            # Step 4: Generate nginx config
-            step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Generating nginx config...")
-            
-            self.generate_nginx_config(install_path)
-            self.log("  ✓ nginx-advanced.conf created")
+            make_dirs(install_path, self._plan.dirs)
+            for d in self._plan.dirs:
+                self.log_add(f"  ✓ {d}/")
+            self.log_flush()
             
-            # Step 5: Generate docker-compose
-            step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Generating docker-compose...")
+            # Steps 3-6: .env, nginx config, docker-compose and the helper scripts. They
+            # only need the config and no download writes them, so they're written (in
+            # one concurrent batch) while the download runs
+            files = (self.build_env_file(install_path) + self.build_nginx_config(install_path)
+                     + self.build_docker_compose(install_path) + self.build_scripts(install_path))
             
-            self.generate_docker_compose(install_path)
-            self.log("  ✓ docker-compose.yml created")
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='ylem-config') as side:
+                written = side.submit(lambda: list(write_files(files)))
+                
+                # Step 2: Download files from GitHub
+                step += 1
+                self._set_progress((step / total_steps) * 100, "Downloading from GitHub...")
+                self.log("\n📥 Downloading files from GitHub...")
+                
+                # Extraction moves the bar on towards the next step
+                self.download_github_files(install_path, on_progress=lambda fraction: self._set_progress(
+                    (step + fraction) / total_steps * 100))
             
-            # Step 6: Generate scripts
             step += 1
-            self.install_progress['value'] = (step / total_steps) * 100
-            self.status_var.set("Generating scripts...")
-            
-            self.generate_scripts(install_path)
-            self.log("  ✓ Helper scripts created")
+            self._set_progress((step / total_steps) * 100, "Generating configuration...")
+            self.log("\n⚙️ Generating configuration files...")
+            for path, was_written in written.result():
+                self.log_add(f"  ✓ {path.name} {'created' if was_written else 'unchanged'}")
+            self.log_flush()
+            step = total_steps
             
             # Complete install page
-            self.install_progress['value'] = 100
-            self.status_var.set("Installation complete!")
+            self._set_progress(100, "Installation complete!")
             
-            self.log("\n" + "="*50)
-            self.log("FILES INSTALLED SUCCESSFULLY!")
-            self.log("="*50)
-            self.log(f"\nInstalled to: {install_path}")
-            self.log("\nClick 'Next → Setup' to start Docker and configure NPM.")
+            banner = "=" * 50
+            self.log("\n".join([
+                "",
+                banner,
+                "FILES INSTALLED SUCCESSFULLY!",
+                banner,
+                "",
+                f"Installed to: {install_path}",
+                "",
+                "Click 'Next → Setup' to start Docker and configure NPM.",
+            ]))
             
-            # Mark installation as complete
-            self.installation_complete = True
-            self.final_install_path = install_path
-            
-            # Update buttons on main thread
-            self.root.after(0, self._show_install_complete_buttons, install_path)
+            # The Tk thread marks the installation complete and updates the buttons
+            self._ui_queue.put(('done', install_path))
             
         except Exception as e:
+            self.log_flush()  # Whatever the failed phase held goes first
             self.log(f"\nERROR: {str(e)}")
-            self.status_var.set("Installation failed!")
-            messagebox.showerror("Error", f"Installation failed:\n{str(e)}")
+            self._set_progress(None, "Installation failed!")
+            self._ui_queue.put(('error', f"Installation failed:\n{str(e)}"))
     
     def _show_install_complete_buttons(self, install_path):
         """Show buttons after install completes"""
@@ -790,41 +1584,21 @@ Ports:
     
     def _start_docker_cmd(self, install_path):
         """Start docker-compose in a visible CMD window"""
-        try:
-            # Create a batch file to run docker-compose and keep window open
-            batch_content = f'''@echo off
-cd /d "{install_path}"
-echo.
-echo ========================================
-echo   Starting Ylem Docker Containers
-echo ========================================
-echo.
-echo Running: docker-compose up -d
-echo.
-docker-compose up -d
-echo.
-echo ========================================
-echo   Docker Status
-echo ========================================
-echo.
-docker ps
-echo.
-echo ----------------------------------------
-echo Press any key to close this window...
-pause >nul
-'''
-            batch_path = install_path / '_start_docker.bat'
-            batch_path.write_text(batch_content, encoding='utf-8')
-            
-            # Run the batch file in a new CMD window
-            subprocess.Popen(['cmd', '/c', 'start', 'cmd', '/k', str(batch_path)], 
-                           cwd=str(install_path))
-            
+        if self._open_docker_console(install_path, '_start_docker.bat', DOCKER_START_BAT):
             self.log("\n→ Docker CMD window opened!")
-            
+    
+    def _open_docker_console(self, install_path, name, template):
+        """Run one of the docker batch files in its own window; False (after saying so) if it can't"""
+        try:
+            # Rewritten only when the install path changed, so a repeat click skips the write
+            batch_path = install_path / name
+            write_batch_file(batch_path, template.format(install_path=install_path))
+            open_console(batch_path, install_path)
         except Exception as e:
             self.log(f"\nError opening CMD: {str(e)}")
             messagebox.showerror("Error", f"Failed to open CMD:\n{str(e)}")
+            return False
+        return True
     
     # ═══════════════════════════════════════════════════════════════════════════
     # PAGE 5: Setup Guide
@@ -837,6 +1611,15 @@ pause >nul
         ttk.Label(frame, text="Configure NPM and access your sites", 
                   style='SubHeader.TLabel').pack(anchor='w', pady=(0, 10))
         
+        # Everything below is fixed for this page; work the URLs out once
+        cfg = self.config
+        install_path = Path(cfg['install_path'])
+        host_ip = cfg['host_ip']
+        admin_url = f"http://{host_ip}:{cfg['npm_admin_port']}"
+        base_url = f"http://{cfg['domain'] or host_ip}"
+        if cfg['npm_http_port'] != '80':
+            base_url += f":{cfg['npm_http_port']}"
+        
         # Docker Section
         docker_frame = ttk.LabelFrame(frame, text="Docker Containers", padding="10")
         docker_frame.pack(fill=tk.X, pady=5)
@@ -845,9 +1628,9 @@ pause >nul
         docker_row.pack(fill=tk.X)
         
         ttk.Button(docker_row, text="Start Docker (CMD)", 
-                   command=lambda: self._start_docker_cmd(Path(self.config['install_path']))).pack(side=tk.LEFT, padx=5)
+                   command=partial(self._start_docker_cmd, install_path)).pack(side=tk.LEFT, padx=5)
         ttk.Button(docker_row, text="Stop Docker (CMD)", 
-                   command=lambda: self._stop_docker_cmd(Path(self.config['install_path']))).pack(side=tk.LEFT, padx=5)
+                   command=partial(self._stop_docker_cmd, install_path)).pack(side=tk.LEFT, padx=5)
         ttk.Label(docker_row, text="Opens a command window to see Docker output", 
                   foreground='gray').pack(side=tk.LEFT, padx=10)
         
@@ -869,21 +1652,21 @@ pause >nul
         # Domain/IP field
         ttk.Label(fields_frame, text="Domain Names:").grid(row=0, column=0, sticky='e', padx=5, pady=2)
         domain_entry = ttk.Entry(fields_frame, width=40)
-        domain_entry.insert(0, self.config['domain'] or self.config['host_ip'])
+        domain_entry.insert(0, cfg['domain'] or host_ip)
         domain_entry.config(state='readonly')
         domain_entry.grid(row=0, column=1, sticky='w', pady=2)
         
         # Forward IP field
         ttk.Label(fields_frame, text="Forward Hostname:").grid(row=1, column=0, sticky='e', padx=5, pady=2)
         forward_entry = ttk.Entry(fields_frame, width=40)
-        forward_entry.insert(0, self.config['host_ip'])
+        forward_entry.insert(0, host_ip)
         forward_entry.config(state='readonly')
         forward_entry.grid(row=1, column=1, sticky='w', pady=2)
         
         # Forward Port field
         ttk.Label(fields_frame, text="Forward Port:").grid(row=2, column=0, sticky='e', padx=5, pady=2)
         port_entry = ttk.Entry(fields_frame, width=40)
-        port_entry.insert(0, self.config['npm_http_port'])
+        port_entry.insert(0, cfg['npm_http_port'])
         port_entry.config(state='readonly')
         port_entry.grid(row=2, column=1, sticky='w', pady=2)
         
@@ -894,7 +1677,7 @@ pause >nul
         btn_row1.pack(fill=tk.X, pady=(10, 0))
         
         ttk.Button(btn_row1, text="Open NPM Admin", 
-                   command=lambda: self.open_url(f"http://{self.config['host_ip']}:{self.config['npm_admin_port']}")).pack(side=tk.LEFT, padx=5)
+                   command=partial(self.open_url, admin_url)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_row1, text="Show Nginx Config", 
                    command=self._show_nginx_config_window).pack(side=tk.LEFT, padx=5)
         
@@ -902,37 +1685,28 @@ pause >nul
         links_frame = ttk.LabelFrame(frame, text="Your Ylem Sites (click to open, select to copy)", padding="10")
         links_frame.pack(fill=tk.X, pady=5)
         
-        base_url = f"http://{self.config['domain'] or self.config['host_ip']}"
-        if self.config['npm_http_port'] != '80':
-            base_url += f":{self.config['npm_http_port']}"
-        
-        # Create selectable links
-        links = [
-            ("Main Page", f"{base_url}/"),
-        ]
-        if self.selected_components['epg'].get():
-            links.append(("TV Guide", f"{base_url}/guide"))
-        if self.selected_components['games'].get():
-            links.append(("Games Hub", f"{base_url}/games"))
-        links.append(("NPM Admin", f"http://{self.config['host_ip']}:{self.config['npm_admin_port']}"))
-        if self.selected_components['tv'].get():
-            links.append(("EPG Health", f"http://{self.config['host_ip']}:{self.config['epg_server_port']}/health"))
-        
-        for name, url in links:
-            link_row = ttk.Frame(links_frame)
-            link_row.pack(fill=tk.X, pady=2)
-            
-            ttk.Label(link_row, text=f"{name}:", width=12, anchor='e').pack(side=tk.LEFT)
+        # Create selectable links: (name, url, component it needs, or None)
+        links = [(name, url) for name, url, needs in (
+            ("Main Page", f"{base_url}/", None),
+            ("TV Guide", f"{base_url}/guide", 'epg'),
+            ("Games Hub", f"{base_url}/games", 'games'),
+            ("NPM Admin", admin_url, None),
+            ("EPG Health", f"http://{host_ip}:{cfg['epg_server_port']}/health", 'tv'),
+        ) if needs is None or needs in self._plan.components]
+        
+        # One grid for every row, instead of a Frame per link
+        for row, (name, url) in enumerate(links):
+            ttk.Label(links_frame, text=f"{name}:", width=12, anchor='e').grid(row=row, column=0, pady=2)
             
             # Selectable entry for URL
-            url_entry = ttk.Entry(link_row, width=45)
+            url_entry = ttk.Entry(links_frame, width=45)
             url_entry.insert(0, url)
             url_entry.config(state='readonly')
-            url_entry.pack(side=tk.LEFT, padx=5)
+            url_entry.grid(row=row, column=1, padx=5, pady=2)
             
             # Open button
-            ttk.Button(link_row, text="Open", width=6,
-                       command=lambda u=url: self.open_url(u)).pack(side=tk.LEFT, padx=2)
+            ttk.Button(links_frame, text="Open", width=6,
+                       command=partial(self.open_url, url)).grid(row=row, column=2, padx=2, pady=2)
         
         # Install folder
         folder_frame = ttk.LabelFrame(frame, text="Installation Location", padding="10")
@@ -942,22 +1716,27 @@ pause >nul
         folder_row.pack(fill=tk.X)
         
         folder_entry = ttk.Entry(folder_row, width=50)
-        folder_entry.insert(0, str(self.config['install_path']))
+        folder_entry.insert(0, str(install_path))
         folder_entry.config(state='readonly')
         folder_entry.pack(side=tk.LEFT)
         ttk.Button(folder_row, text="Open Folder", 
-                   command=lambda: os.startfile(str(self.config['install_path']))).pack(side=tk.LEFT, padx=10)
+                   command=partial(open_folder, install_path)).pack(side=tk.LEFT, padx=10)
         
         # Update nav buttons
         self.back_btn.config(state=tk.DISABLED)
-        self.next_btn.config(text="Finish", command=self.root.quit)
+        self.next_btn.config(text="Finish", command=self.close)
+    
+    def _nginx_config_text(self):
+        """The nginx config this session generated, else the one a previous install wrote"""
+        if self._nginx_text is not None:
+            return self._nginx_text
+        config_path = Path(self.config['install_path']) / 'setup' / 'templates' / 'nginx-advanced.conf'
+        return config_path.read_text(encoding='utf-8')
     
     def _show_nginx_config_window(self):
         """Show nginx config in a popup window for easy copying"""
         try:
-            install_path = Path(self.config['install_path'])
-            config_path = install_path / 'setup' / 'templates' / 'nginx-advanced.conf'
-            config_text = config_path.read_text(encoding='utf-8')
+            config_text = self._nginx_config_text()
             
             # Create popup window
             popup = tk.Toplevel(self.root)
@@ -1005,59 +1784,64 @@ pause >nul
     
     def _stop_docker_cmd(self, install_path):
         """Stop docker-compose in a visible CMD window"""
-        try:
-            batch_content = f'''@echo off
-cd /d "{install_path}"
-echo.
-echo ========================================
-echo   Stopping Ylem Docker Containers
-echo ========================================
-echo.
-docker-compose down
-echo.
-echo Done! Containers stopped.
-echo.
-pause
-'''
-            batch_path = install_path / '_stop_docker.bat'
-            batch_path.write_text(batch_content, encoding='utf-8')
-            
-            subprocess.Popen(['cmd', '/c', 'start', 'cmd', '/k', str(batch_path)], 
-                           cwd=str(install_path))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to open CMD:\n{str(e)}")
+        self._open_docker_console(install_path, '_stop_docker.bat', DOCKER_STOP_BAT)
     
     def _copy_nginx_config_from_setup(self):
         """Copy nginx config to clipboard from setup page"""
         try:
-            install_path = Path(self.config['install_path'])
-            config_path = install_path / 'setup' / 'templates' / 'nginx-advanced.conf'
-            config_text = config_path.read_text(encoding='utf-8')
+            config_text = self._nginx_config_text()
             self.root.clipboard_clear()
             self.root.clipboard_append(config_text)
             messagebox.showinfo("Copied!", "Nginx config copied to clipboard!\n\nPaste it into NPM → Proxy Host → Advanced tab")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to copy: {str(e)}")
     
+    def _stream_cmd(self, cmd, cwd=None, timeout=None):
+        """Run cmd, logging each output line as it arrives; returns the exit code"""
+        import subprocess
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding='utf-8', errors='replace', bufsize=1)
+        expired = threading.Event()
+        finished = threading.Event()
+        last_output = time.monotonic()
+        
+        # timeout is seconds without output, not in total: a first docker-compose up
+        # can spend minutes pulling images, but it keeps printing while it does
+        def watchdog():
+            while not finished.wait(min(timeout, 1.0)):
+                if time.monotonic() - last_output > timeout:
+                    expired.set()
+                    proc.kill()
+                    return
+        
+        if timeout:
+            threading.Thread(target=watchdog, name='ylem-watchdog', daemon=True).start()
+        try:
+            # Plain blocking reads on this worker thread: selectors can't poll pipes on Windows
+            with proc.stdout:
+                for line in proc.stdout:
+                    last_output = time.monotonic()
+                    line = line.rstrip()
+                    if line:
+                        self.log(f"  {line}")
+            returncode = proc.wait()
+        finally:
+            finished.set()
+        
+        if expired.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return returncode
+    
     def _run_docker_sync(self, install_path):
-        """Run docker-compose up synchronously"""
+        """Run docker-compose up, streaming its output to the log"""
+        import subprocess
         try:
-            result = subprocess.run(
-                ['docker-compose', 'up', '-d'],
-                cwd=str(install_path),
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            if result.returncode == 0:
-                self.log(result.stdout)
+            if self._stream_cmd(['docker-compose', 'up', '-d'], cwd=str(install_path), timeout=120) == 0:
                 return True
-            else:
-                self.log(f"  Docker error: {result.stderr}")
-                return False
+            self.log("  Docker error: docker-compose up failed")
+            return False
         except subprocess.TimeoutExpired:
-            self.log("  Docker timed out")
+            self.log("  Docker timed out (no output for 2 minutes)")
             return False
         except FileNotFoundError:
             self.log("  Docker not found. Is Docker Desktop installed and running?")
@@ -1066,277 +1850,242 @@ pause
             self.log(f"  Docker error: {str(e)}")
             return False
     
-    def download_github_files(self, install_path):
-        """Download files from GitHub"""
-        import zipfile
-        import io
-        
-        # GitHub raw URL for the repo
-        base_url = f"https://raw.githubusercontent.com/{GITHUB_USER}/{GITHUB_REPO}/main"
-        
-        # Files to download based on selected components
-        files_to_download = []
-        
-        # Core files (always needed)
-        files_to_download.extend([
-            ('data/index.html', 'data/index.html'),
-            ('data/watch.html', 'data/watch.html'),
-        ])
+    def download_github_files(self, install_path, on_progress=None):
+        """Download files from GitHub: one release archive, or single files as a fallback"""
+        try:
+            self._download_release_zip(install_path, on_progress)
+            return
+        except Exception as e:
+            # No published release yet, API rate limit...
+            self.log(f"  Release archive unavailable ({str(e)[:50]}), trying the main branch archive")
         
-        # TV/EPG files
-        if self.selected_components['tv'].get():
-            files_to_download.extend([
-                ('epg-server/epg-server.js', 'epg-server/epg-server.js'),
-            ])
+        # Still one request, and it needs no API call first
+        try:
+            self._download_zip(install_path, GITHUB_BRANCH_ZIP_URL, 'main', on_progress)
+            return
+        except Exception as e:
+            # Proxy blocking codeload.github.com...
+            self.log(f"  Branch archive unavailable ({str(e)[:50]}), downloading files individually")
         
-        # EPG Guide
-        if self.selected_components['epg'].get():
-            files_to_download.extend([
-                ('web/v2/guide.html', 'data/v2/guide.html'),
-            ])
+        self._download_raw_files(install_path, on_progress)
+    
+    def _download_release_zip(self, install_path, on_progress=None):
+        """Fetch the latest release zipball in one request and extract the selected components"""
+        release = fetch_release()
+        # A tag's archive doesn't change, so it is kept for later installs
+        self._download_zip(install_path, release['zipball_url'], release['tag_name'], on_progress, keep=True)
+    
+    def _download_zip(self, install_path, url, ref, on_progress=None, keep=False):
+        """Extract the selected components from the GitHub zip archive of ref at url"""
+        # Repo paths of the selected components, as one regex instead of a startswith per path
+        wanted = path_matcher(self._plan.files)
+        
+        # Re-install: files already matching the release's tree are left alone, and
+        # when that is all of them the archive isn't downloaded at all
+        tree = self._fetch_tree_or_none(ref)
+        if tree is not None:
+            needed = changed_paths(install_path, tree, filter(wanted, tree))
+            if not needed:
+                self.log(f"  All files already match {ref}")
+                return
+            wanted = needed.__contains__
         
-        # Game files
-        if self.selected_components['games'].get():
-            files_to_download.extend([
-                ('game-server/server.js', 'game-server/server.js'),
-                ('game-server/package.json', 'game-server/package.json'),
-                ('game-server/shared/index.js', 'game-server/shared/index.js'),
-                ('web/v2/games.html', 'data/v2/games.html'),
-                ('web/v2/games/boggle/boggle.html', 'data/v2/games/boggle/boggle.html'),
-                ('web/v2/games/scrabble/scrabble.html', 'data/v2/games/scrabble/scrabble.html'),
-                ('web/v2/games/scrabble/lobby.html', 'data/v2/games/scrabble/lobby.html'),
-                ('web/v2/css/common.css', 'data/v2/css/common.css'),
-                ('web/v2/css/auth.css', 'data/v2/css/auth.css'),
-                ('web/v2/css/game-common.css', 'data/v2/css/game-common.css'),
-                ('web/v2/css/inventory.css', 'data/v2/css/inventory.css'),
-                ('web/v2/css/leaderboard.css', 'data/v2/css/leaderboard.css'),
-                ('web/v2/css/wager.css', 'data/v2/css/wager.css'),
-                ('web/v2/js/auth.js', 'data/v2/js/auth.js'),
-                ('web/v2/js/config.js', 'data/v2/js/config.js'),
-                ('web/v2/js/dictionary.js', 'data/v2/js/dictionary.js'),
-                ('web/v2/js/inventory.js', 'data/v2/js/inventory.js'),
-                ('web/v2/js/items.js', 'data/v2/js/items.js'),
-                ('web/v2/js/leaderboard.js', 'data/v2/js/leaderboard.js'),
-                ('web/v2/js/wager.js', 'data/v2/js/wager.js'),
-            ])
-        
-        # Diagnostics
-        if self.selected_components['diagnostics'].get():
-            files_to_download.extend([
-                ('diagnostics/collector.py', 'diagnostics/collector.py'),
-                ('diagnostics/requirements.txt', 'diagnostics/requirements.txt'),
-                ('diagnostics/static/dashboard.html', 'diagnostics/static/dashboard.html'),
-            ])
-        
-        # Pi client
-        if self.selected_components['pi_client'].get():
-            files_to_download.extend([
-                ('pi-client/pi_setup.sh', 'pi-client/pi_setup.sh'),
-                ('pi-client/stream_startup.sh', 'pi-client/stream_startup.sh'),
-                ('pi-client/tv_control.py', 'pi-client/tv_control.py'),
-                ('pi-client/pi_reporter.py', 'pi-client/pi_reporter.py'),
-                ('pi-client/boot/config.txt', 'pi-client/boot/config.txt'),
-                ('pi-client/boot/cmdline.txt', 'pi-client/boot/cmdline.txt'),
-            ])
-        
-        # Download each file
-        success_count = 0
-        fail_count = 0
+        import tempfile
+        import zipfile
         
-        for remote_path, local_path in files_to_download:
+        # On disk rather than in memory, so every extraction thread can reopen it.
+        # The download is the first half of on_progress, extraction the second
+        cached = self._archive_cache_path(ref) if keep else None
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if cached is not None and cached.exists():
+                self.log(f"  Using the {ref} archive from an earlier run")
+                archive_path = cached
+                if on_progress:
+                    on_progress(0.5)
+            else:
+                self.log(f"  Downloading {ref} archive...")
+                archive_path = cached.with_suffix('.part') if cached is not None else Path(tmp_dir) / 'archive.zip'
+                self._fetch_archive(url, archive_path, on_progress)
+                if cached is not None:
+                    os.replace(archive_path, cached)
+                    archive_path = cached
+                    for old in cached.parent.glob('archive-*.zip'):
+                        if old != cached:
+                            old.unlink(missing_ok=True)  # Only the latest release is worth keeping
+            
             try:
-                url = f"{base_url}/{remote_path}"
-                self.log(f"  Downloading {remote_path}...")
-                
-                req = Request(url, headers={'User-Agent': 'YlemInstaller/1.0'})
-                response = urlopen(req, timeout=30)
-                content = response.read()
-                
-                # Ensure directory exists
-                dest_file = install_path / local_path
-                dest_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Write file
-                dest_file.write_bytes(content)
-                self.log(f"    ✓ {local_path}")
-                success_count += 1
+                with zipfile.ZipFile(archive_path) as zf:
+                    # Members are "<owner>-<repo>-<sha>/<path>"; drop the top folder
+                    members = [(info, info.filename.partition('/')[2]) for info in zf.infolist()]
+            except zipfile.BadZipFile:
+                if archive_path == cached:
+                    cached.unlink(missing_ok=True)  # Damaged on disk; fetch it again next time
+                raise
+            members = [(info, local_path(repo_path)) for info, repo_path in members
+                       if not info.is_dir() and wanted(repo_path)]
+            
+            # Every destination folder up front, so the workers only write files
+            make_dirs(install_path, (os.path.dirname(path) for _, path in members))
+            
+            # A ZipFile shares one read position, so each worker thread opens its own
+            handles = threading.local()
+            opened = []
+            
+            def extract(info, path):
+                zf = getattr(handles, 'zf', None)
+                if zf is None:
+                    zf = handles.zf = zipfile.ZipFile(archive_path)
+                    opened.append(zf)
                 
-            except Exception as e:
-                self.log(f"    ✗ Failed: {local_path} ({str(e)[:50]})")
-                fail_count += 1
+                # Small files: one read and one write. Big ones (mostly data/Images/) are
+                # streamed in 1 MiB writes into space reserved up front
+                if info.file_size < LARGE_MEMBER_SIZE:
+                    write_file(install_path / path, zf.read(info))
+                    return
+                with zf.open(info) as src, open(install_path / path, 'wb', buffering=0) as dst:
+                    preallocate(dst.fileno(), info.file_size)
+                    shutil.copyfileobj(src, dst, 1 << 20)
+            
+            # zlib drops the GIL while inflating, so the members decompress in parallel on
+            # every core. That beats libarchive: it reads one entry at a time, and is a
+            # native library the frozen exe would have to bundle
+            try:
+                with ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='ylem-extract') as pool:
+                    futures = [pool.submit(extract, info, path) for info, path in members]
+                    for extracted, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        if on_progress:
+                            on_progress(0.5 + 0.5 * extracted / len(futures))
+            finally:
+                # Windows can't remove the temp dir while the archive is open
+                for zf in opened:
+                    zf.close()
+        
+        self.log(f"\n  Extracted: {len(members)} files")
+    
+    def _archive_cache_path(self, ref):
+        """Where the archive of ref is kept between runs, or None without a cache folder"""
+        try:
+            return writable_cache_dir() / ('archive-' + re.sub(r'[^\w.-]', '_', ref) + '.zip')
+        except OSError:
+            return None
+    
+    def _fetch_archive(self, url, archive_path, on_progress=None):
+        """Stream url into archive_path, reporting it as the first half of on_progress"""
+        with http_get(url, timeout=60) as response, open(archive_path, 'wb') as archive:
+            total = int(response.headers.get('Content-Length') or 0)  # codeload may stream without one
+            received = 0
+            while chunk := response.read(1 << 20):
+                archive.write(chunk)
+                received += len(chunk)
+                if on_progress and total:
+                    on_progress(0.5 * min(received / total, 1.0))
+    
+    def _download_raw_files(self, install_path, on_progress=None):
+        """Download the selected files one by one from raw.githubusercontent.com"""
+        # From the plan: the selected components' raw_files, with their install paths
+        files_to_download = list(self._plan.raw_files)
+        
+        # Skip files that already match the branch
+        tree = self._fetch_tree_or_none('main')
+        if tree is not None:
+            needed = changed_paths(install_path, tree, (remote for remote, _ in files_to_download))
+            if len(needed) < len(files_to_download):
+                self.log(f"  {len(files_to_download) - len(needed)} files already up to date")
+            files_to_download = [(remote, local) for remote, local in files_to_download if remote in needed]
+        
+        # Download all files concurrently; results are logged from this thread as they finish
+        success_count = 0
+        fail_count = 0
+    
+        make_dirs(install_path, (os.path.dirname(path) for _, path in files_to_download))
+        
+        # Start from what the last run settled on
+        start = load_state().get('download_workers', DOWNLOAD_WORKERS_START)
+        limiter = AdaptiveLimiter(max(1, min(int(start), DOWNLOAD_WORKERS_MAX)), DOWNLOAD_WORKERS_MAX)
+        
+        def fetch(url, dest_file):
+            with limiter:
+                limiter.record(self._download_file(url, dest_file))
+        
+        self.log(f"  Downloading {len(files_to_download)} files...")
+        workers = max(1, min(DOWNLOAD_WORKERS_MAX, len(files_to_download)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ylem-download') as pool:
+            futures = {
+                pool.submit(fetch, f"{GITHUB_RAW_URL}/{remote_path}", install_path / local_path): local_path
+                for remote_path, local_path in files_to_download
+            }
+            for finished, future in enumerate(as_completed(futures), 1):
+                local_path = futures[future]
+                try:
+                    future.result()
+                    self.log(f"    ✓ {local_path}")
+                    success_count += 1
+                except Exception as e:
+                    self.log(f"    ✗ Failed: {local_path} ({str(e)[:50]})")
+                    fail_count += 1
+                if on_progress:
+                    on_progress(finished / len(futures))
         
         self.log(f"\n  Downloaded: {success_count} files, Failed: {fail_count} files")
+        if success_count:
+            save_state(download_workers=limiter.limit)
     
-    def generate_env_file(self, install_path):
-        """Generate .env file"""
-        env = f"""# Ylem Configuration
-# Generated by Ylem Installer
-
-# Network
-HOST_IP={self.config['host_ip']}
-DOMAIN={self.config['domain']}
-
-# Ports
-NPM_HTTP_PORT={self.config['npm_http_port']}
-NPM_HTTPS_PORT={self.config['npm_https_port']}
-NPM_ADMIN_PORT={self.config['npm_admin_port']}
-GAME_SERVER_PORT={self.config.get('game_server_port', '3000')}
-EPG_SERVER_PORT={self.config.get('epg_server_port', '3001')}
-ERSATZTV_PORT={self.config['ersatztv_port']}
-
-# DuckDNS (Dynamic DNS)
-DUCKDNS_ENABLED={str(self.config['duckdns_enabled']).lower()}
-DUCKDNS_SUBDOMAIN={self.config['duckdns_subdomain']}
-DUCKDNS_TOKEN={self.config['duckdns_token']}
-
-# Channels are automatically loaded from ErsatzTV
-# No manual configuration needed!
-"""
-        (install_path / '.env').write_text(env, encoding='utf-8')
+    def _fetch_tree_or_none(self, ref):
+        """The repo tree at ref, or None (meaning: compare nothing, install everything)"""
+        try:
+            return fetch_tree(ref)
+        except Exception as e:
+            self.log(f"  Can't compare with existing files ({str(e)[:50]})")
+            return None
     
-    def generate_nginx_config(self, install_path):
-        """Generate nginx config"""
-        config = f"""# Ylem - Nginx Proxy Manager Advanced Config
-# Paste into NPM -> Proxy Host -> Advanced
-
-location = / {{
-    root /data/data;
-    try_files /index.html =404;
-}}
-
-location ~ ^/ch\\d+$ {{
-    root /data/data;
-    try_files /watch.html =404;
-}}
-
-location /iptv/ {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['ersatztv_port']}/iptv/;
-    proxy_http_version 1.1;
-    proxy_buffering off;
-}}
-"""
-        
-        if self.selected_components['games'].get():
-            config += f"""
-location /ws/ {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['game_server_port']}/;
-    proxy_http_version 1.1;
-    proxy_set_header Upgrade $http_upgrade;
-    proxy_set_header Connection "upgrade";
-    proxy_read_timeout 86400;
-}}
-
-location /v2/ {{
-    root /data/data;
-    try_files $uri $uri/ =404;
-}}
-
-location = /games {{
-    root /data/data;
-    try_files /v2/games.html =404;
-}}
-"""
-        
-        if self.selected_components['tv'].get():
-            config += f"""
-location ^~ /api/epg {{
-    proxy_pass http://{self.config['host_ip']}:{self.config['epg_server_port']};
-    proxy_http_version 1.1;
-}}
-
-location = /guide {{
-    root /data/data;
-    try_files /v2/guide.html =404;
-}}
-"""
-        
-        (install_path / 'setup' / 'templates' / 'nginx-advanced.conf').write_text(config, encoding='utf-8')
+    def _download_file(self, url, dest_file):
+        """Fetch one URL into dest_file (runs on a download worker thread); returns its size"""
+        with http_get(url) as response:
+            # Like archive members: small files in one read and write, big ones streamed
+            # to disk in 1 MiB chunks instead of held whole in memory
+            size = int(response.headers.get('Content-Length') or 0)
+            if size < LARGE_MEMBER_SIZE:
+                content = response.read()
+                write_file(dest_file, content)
+                return len(content)
+            with open(dest_file, 'wb', buffering=0) as dst:
+                preallocate(dst.fileno(), size)
+                shutil.copyfileobj(response, dst, 1 << 20)
+                dst.truncate()  # In case the body came out shorter than announced
+                return dst.tell()
     
-    def generate_docker_compose(self, install_path):
-        """Generate docker-compose.yml"""
-        compose = f"""services:
-  app:
-    image: 'jc21/nginx-proxy-manager:latest'
-    container_name: ylem-npm
-    restart: unless-stopped
-    ports:
-      - '{self.config['npm_http_port']}:80'
-      - '{self.config['npm_https_port']}:443'
-      - '{self.config['npm_admin_port']}:81'
-    volumes:
-      - ./npm-data:/data
-      - ./letsencrypt:/etc/letsencrypt
-      - ./data:/data/data:ro
-    extra_hosts:
-      - "host.docker.internal:host-gateway"
-"""
-        
-        if self.selected_components['tv'].get():
-            compose += f"""
-  epg-server:
-    image: 'node:20-alpine'
-    container_name: ylem-epg-server
-    restart: unless-stopped
-    working_dir: /app
-    command: node epg-server.js
-    ports:
-      - '{self.config['epg_server_port']}:3001'
-    volumes:
-      - ./epg-server:/app
-    environment:
-      - PORT=3001
-      - HOST_IP={self.config['host_ip']}
-      - ERSATZTV_PORT={self.config['ersatztv_port']}
-    extra_hosts:
-      - "host.docker.internal:host-gateway"
-"""
-        
-        if self.selected_components['games'].get():
-            compose += f"""
-  game-server:
-    image: 'node:20-alpine'
-    container_name: ylem-game-server
-    restart: unless-stopped
-    working_dir: /app
-    command: sh -c "npm install && node server.js"
-    ports:
-      - '{self.config['game_server_port']}:3000'
-    volumes:
-      - ./game-server:/app
-    environment:
-      - PORT=3000
-"""
-        
-        (install_path / 'docker-compose.yml').write_text(compose, encoding='utf-8')
+    def _variant(self):
+        """The (games, tv) key of NGINX_VARIANTS / COMPOSE_VARIANTS for this plan"""
+        return 'games' in self._plan.components, 'tv' in self._plan.components
     
-    def generate_scripts(self, install_path):
-        """Generate helper scripts"""
-        # Start script
-        start_script = f"""@echo off
-echo Starting Ylem...
-cd /d "{install_path}"
-docker-compose up -d
-echo.
-echo Ylem is running!
-echo   Web: http://{self.config['host_ip']}:{self.config['npm_http_port']}
-echo   Admin: http://{self.config['host_ip']}:{self.config['npm_admin_port']}
-pause
-"""
-        (install_path / 'start.bat').write_text(start_script, encoding='utf-8')
-        
-        # Stop script
-        stop_script = f"""@echo off
-echo Stopping Ylem...
-cd /d "{install_path}"
-docker-compose down
-echo Ylem stopped.
-pause
-"""
-        (install_path / 'stop.bat').write_text(stop_script, encoding='utf-8')
-        
-        self.log("  ✓ start.bat")
-        self.log("  ✓ stop.bat")
-
+    def build_env_file(self, install_path):
+        """.env as [(path, bytes)]"""
+        cfg = self._cfg
+        env = ENV_TEMPLATE.format_map({**cfg, 'duckdns_enabled': str(cfg['duckdns_enabled']).lower()})
+        return [(install_path / '.env', env.encode('utf-8'))]
+    
+    def build_nginx_config(self, install_path):
+        """The NPM advanced nginx config as [(path, bytes)]"""
+        config = NGINX_VARIANTS[self._variant()].format_map(self._cfg)
+        self._nginx_text = config
+        return [(install_path / 'setup' / 'templates' / 'nginx-advanced.conf', config.encode('utf-8'))]
+    
+    def build_docker_compose(self, install_path):
+        """docker-compose.yml as [(path, bytes)]"""
+        compose = COMPOSE_VARIANTS[self._variant()].format_map(self._cfg)
+        return [(install_path / 'docker-compose.yml', compose.encode('utf-8'))]
+    
+    def build_scripts(self, install_path):
+        """start.bat and stop.bat as [(path, bytes)]"""
+        # Stringified once for both scripts (and normalized, unlike the raw config value)
+        context = {**self._cfg, 'install_path': str(install_path)}
+        
+        return [
+            (install_path / name, batch_bytes(BAT_TEMPLATE.format_map(
+                {**context, 'verb': verb, 'command': command, 'after': after.format_map(context)})))
+            for name, verb, command, after in BAT_SCRIPTS
+        ]
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENTRY POINT